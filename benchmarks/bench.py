@@ -0,0 +1,482 @@
+"""
+Botree benchmarks.
+
+Runs fully offline, against in-process moto mocks (the default) or any local
+S3/AWS compatible endpoint (moto server, MinIO, LocalStack) given with
+`--endpoint-url`. Each scenario reports ops/s, p50/p99 latency and peak
+memory (tracemalloc, in a separate untimed pass). Results are written as JSON
+and can be compared with a previous run:
+
+    python benchmarks/bench.py --output main.json
+    python benchmarks/bench.py --quick --compare main.json
+
+In mock mode, memory and latency include the in-process moto backend.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import botree  # noqa: E402
+
+from botree.logs import Logs  # noqa: E402
+from botree.s3 import S3  # noqa: E402
+from botree.secrets_manager import SecretsManager  # noqa: E402
+from botree.utils import bounded_map  # noqa: E402
+
+
+KIB = 1024
+MIB = 1024 * KIB
+
+
+@dataclass
+class Scenario:
+    """A benchmarked operation, applied to every item returned by `prepare`."""
+
+    name: str
+    params: Dict[str, Any]
+    prepare: Callable[[], List[Any]]
+    operation: Callable[[Any], Any]
+    concurrency: int = 1
+
+
+@dataclass
+class Result:
+    """Measures of a scenario."""
+
+    name: str
+    params: Dict[str, Any]
+    ops: int
+    seconds: float
+    ops_per_second: float
+    p50_ms: float
+    p99_ms: float
+    peak_memory_bytes: Optional[int] = None
+
+    @property
+    def key(self) -> str:
+        """Identify the scenario across runs."""
+        return self.name + json.dumps(self.params, sort_keys=True)
+
+
+@dataclass
+class Environment:
+    """Botree instances and local files shared by the scenarios."""
+
+    session: botree.Session
+    endpoint_url: Optional[str]
+    directory: Path
+    quick: bool
+    bucket_name: str = field(
+        default_factory=lambda: f"botree-bench-{uuid.uuid4().hex[:8]}"
+    )
+
+    def client_kwargs(self) -> Dict[str, Any]:
+        """Client parameters pointing to the endpoint, if any."""
+        return {"endpoint_url": self.endpoint_url} if self.endpoint_url else {}
+
+    def s3(self) -> S3:
+        """S3 wrapper bound to the endpoint."""
+        return S3(
+            self.session.session, clients=self.session.clients, **self.client_kwargs()
+        )
+
+    def secrets_manager(self) -> SecretsManager:
+        """Secrets Manager wrapper bound to the endpoint."""
+        return SecretsManager(
+            self.session.session,
+            client_kwargs=self.client_kwargs(),
+            clients=self.session.clients,
+        )
+
+    def file(self, size: int) -> Path:
+        """Local file of `size` random bytes."""
+        path = self.directory / f"source-{size}.bin"
+        if not path.is_file():
+            path.write_bytes(os.urandom(size))
+        return path
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    if not values:
+        return 0.0
+    index = max(0, min(len(values) - 1, int(len(values) * q / 100 + 0.5) - 1))
+    return values[index]
+
+
+def timed_run(scenario: Scenario, items: List[Any]) -> Result:
+    """Run a scenario, timing every operation."""
+    latencies: List[float] = list()
+    lock = threading.Lock()
+
+    def timed(item: Any):
+        start = time.perf_counter()
+        scenario.operation(item)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    if scenario.concurrency == 1:
+        for item in items:
+            timed(item)
+    else:
+        with ThreadPoolExecutor(max_workers=scenario.concurrency) as executor:
+            list(executor.map(timed, items))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return Result(
+        name=scenario.name,
+        params=scenario.params,
+        ops=len(items),
+        seconds=seconds,
+        ops_per_second=len(items) / seconds if seconds else 0.0,
+        p50_ms=percentile(latencies, 50) * 1000,
+        p99_ms=percentile(latencies, 99) * 1000,
+    )
+
+
+def peak_memory(scenario: Scenario, items: List[Any]) -> int:
+    """Peak traced memory of a scenario run, in bytes."""
+    tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(max_workers=scenario.concurrency) as executor:
+            list(executor.map(scenario.operation, items))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(scenario: Scenario, memory: bool = True) -> Result:
+    """Measure a scenario: a timed pass, then an optional memory pass."""
+    result = timed_run(scenario, scenario.prepare())
+    if memory:
+        result.peak_memory_bytes = peak_memory(scenario, scenario.prepare())
+    return result
+
+
+def session_scenarios(env: Environment) -> Iterator[Scenario]:
+    """Session construction and service wrappers access."""
+    credentials = dict(
+        access_key_id="testing", secret_access_key="testing", region="us-east-1"
+    )
+    count = 200 if env.quick else 1000
+
+    def properties(_):
+        session = botree.Session(**credentials)
+        return (
+            session.s3,
+            session.secrets_manager,
+            session.logs,
+            session.cost_explorer,
+        )
+
+    yield Scenario("session.properties", {}, lambda: list(range(count)), properties)
+    yield Scenario(
+        "session.first_client",
+        {},
+        lambda: list(range(count // 10)),
+        lambda _: botree.Session(**credentials).s3.client,
+    )
+
+
+def s3_transfer_scenarios(env: Environment) -> Iterator[Scenario]:
+    """Upload, download, copy and delete, by object size and concurrency."""
+    bucket = env.s3().bucket(env.bucket_name)
+    sizes = [KIB, MIB] if env.quick else [KIB, MIB, 16 * MIB]
+    downloads = env.directory / "downloads"
+    downloads.mkdir(exist_ok=True)
+
+    for size in sizes:
+        source = env.file(size)
+        count = max(4, (64 if env.quick else 256) // max(1, size // MIB))
+        keys = [f"transfer/{size}/{i}.bin" for i in range(count)]
+        copies = [f"copies/{key}" for key in keys]
+
+        def copy_all(keys=keys, copies=copies):
+            for key in keys:
+                bucket.copy(Path(key), Path(f"copies/{key}"))
+            return copies
+
+        for concurrency in (1, 8):
+            params = {"size": size, "objects": count, "concurrency": concurrency}
+            yield Scenario(
+                "s3.upload",
+                params,
+                lambda keys=keys: keys,
+                lambda key, source=source: bucket.upload(source, Path(key)),
+                concurrency,
+            )
+            yield Scenario(
+                "s3.download",
+                params,
+                lambda keys=keys: keys,
+                lambda key: bucket.download(
+                    Path(key), downloads / key.replace("/", "_")
+                ),
+                concurrency,
+            )
+            yield Scenario(
+                "s3.copy",
+                params,
+                lambda keys=keys: keys,
+                lambda key: bucket.copy(Path(key), Path(f"copies/{key}")),
+                concurrency,
+            )
+            yield Scenario(
+                "s3.delete",
+                params,
+                copy_all,
+                lambda key: bucket.delete(Path(key)),
+                concurrency,
+            )
+
+
+def s3_listing_scenarios(env: Environment) -> Iterator[Scenario]:
+    """list_files and paginate_objects, by number of objects."""
+    bucket = env.s3().bucket(env.bucket_name)
+    repeats = 3 if env.quick else 10
+
+    for count in [100, 1000] if env.quick else [100, 1000, 10000]:
+        prefix = f"listing/{count}/"
+        keys = (f"{prefix}{i:06d}" for i in range(count))
+        for _ in bounded_map(
+            lambda key: bucket.client.put_object(Bucket=bucket.name, Key=key, Body=b""),
+            keys,
+            max_workers=16,
+        ):
+            pass
+
+        params = {"objects": count}
+        yield Scenario(
+            "s3.list_files",
+            params,
+            lambda: list(range(repeats)),
+            lambda _, prefix=prefix: bucket.list_files(prefix),
+        )
+        yield Scenario(
+            "s3.paginate_objects",
+            params,
+            lambda: list(range(repeats)),
+            lambda _, prefix=prefix: sum(1 for _ in bucket.paginate_objects(prefix)),
+        )
+
+
+def secrets_scenarios(env: Environment) -> Iterator[Scenario]:
+    """get_secret, with and without the in-memory cache."""
+    count = 20
+    names = [f"botree-bench-{uuid.uuid4().hex[:8]}-{i}" for i in range(count)]
+    secrets = env.secrets_manager()
+    for name in names:
+        secrets.client.create_secret(Name=name, SecretString=json.dumps({"key": name}))
+
+    gets = 200 if env.quick else 1000
+    items = [names[i % count] for i in range(gets)]
+
+    for cached in (False, True):
+        manager = env.secrets_manager()
+        if cached:
+            manager.enable_cache(ttl=3600, refresh_ahead=0)
+        for concurrency in (1, 8):
+            yield Scenario(
+                "secrets_manager.get_secret",
+                {"secrets": count, "cache": cached, "concurrency": concurrency},
+                lambda: items,
+                lambda name, manager=manager: manager.get_secret(name),
+                concurrency,
+            )
+
+
+class InsightsStub:
+    """In-process Logs Insights stand-in, as moto does not implement queries."""
+
+    def __init__(self, rows: int, polls: int):
+        self.polls = polls
+        self.results = [
+            [{"field": "@message", "value": f"message {i}"}] for i in range(rows)
+        ]
+        self._queries: Dict[str, int] = dict()
+        self._lock = threading.Lock()
+
+    def start_query(self, **kwargs) -> Dict[str, str]:
+        query_id = uuid.uuid4().hex
+        with self._lock:
+            self._queries[query_id] = 0
+        return {"queryId": query_id}
+
+    def get_query_results(self, queryId: str) -> Dict[str, Any]:
+        with self._lock:
+            self._queries[queryId] += 1
+            if self._queries[queryId] < self.polls:
+                return {"status": "Running", "results": []}
+        return {"status": "Complete", "results": self.results}
+
+    def stop_query(self, queryId: str):
+        return {"success": True}
+
+
+def logs_scenarios(env: Environment) -> Iterator[Scenario]:
+    """execute_query polling and results retrieval overhead."""
+    rows = 1000
+    if env.endpoint_url:
+        logs = Logs(
+            env.session.session,
+            client_kwargs=env.client_kwargs(),
+            clients=env.session.clients,
+        )
+    else:
+        logs = Logs(env.session.session)
+        stub = InsightsStub(rows, polls=3)
+        logs.clients.client = lambda *args, **kwargs: stub  # type: ignore
+
+    count = 50 if env.quick else 200
+    for concurrency in (1, 8):
+        yield Scenario(
+            "logs.execute_query",
+            {"rows": rows, "concurrency": concurrency},
+            lambda: list(range(count)),
+            lambda _: logs.execute_query(
+                ["/botree/bench"], "fields @message", 0, 1, poll_interval=0.001
+            ),
+            concurrency,
+        )
+
+
+SCENARIOS = [
+    session_scenarios,
+    s3_transfer_scenarios,
+    s3_listing_scenarios,
+    secrets_scenarios,
+    logs_scenarios,
+]
+
+
+def metadata(env: Environment) -> Dict[str, Any]:
+    """Describe the run, so results of different commits can be told apart."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import boto3
+
+    return {
+        "commit": commit,
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "boto3": boto3.__version__,
+        "backend": env.endpoint_url or "moto (in-process)",
+        "quick": env.quick,
+    }
+
+
+def compare(results: List[Result], baseline: Dict[str, Any]):
+    """Print ops/s and p99 changes relative to a previous run."""
+    previous = {
+        Result(**item).key: Result(**item) for item in baseline.get("results", [])
+    }
+    print(f"\n{'scenario':<60} {'ops/s':>9} {'p99':>9}")
+    for result in results:
+        old = previous.get(result.key)
+        if old is None or not old.ops_per_second or not old.p99_ms:
+            continue
+        speed = result.ops_per_second / old.ops_per_second - 1
+        latency = result.p99_ms / old.p99_ms - 1
+        print(f"{result.key:<60} {speed:>+9.1%} {latency:>+9.1%}")
+
+
+def report(result: Result):
+    """Print a result line."""
+    memory = result.peak_memory_bytes
+    print(
+        f"{result.key:<60} {result.ops_per_second:>10.1f} ops/s"
+        f" p50 {result.p50_ms:>8.2f} ms p99 {result.p99_ms:>8.2f} ms"
+        + (f" peak {memory / MIB:>7.2f} MiB" if memory is not None else "")
+    )
+
+
+def mocks() -> ExitStack:
+    """Enter moto's in-process mocks of the benchmarked services."""
+    from moto import mock_logs
+    from moto import mock_s3
+    from moto import mock_secretsmanager
+
+    stack = ExitStack()
+    for mock in (mock_s3, mock_secretsmanager, mock_logs):
+        stack.enter_context(mock())
+    return stack
+
+
+def main(argv: Optional[List[str]] = None):
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoint-url", help="local S3/AWS compatible endpoint")
+    parser.add_argument("--output", type=Path, help="write results to a JSON file")
+    parser.add_argument("--compare", type=Path, help="previous JSON results")
+    parser.add_argument("--quick", action="store_true", help="smaller scenarios")
+    parser.add_argument("--no-memory", action="store_true", help="skip memory pass")
+    parser.add_argument("--filter", default="", help="only run matching scenarios")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+    with ExitStack() as stack, tempfile.TemporaryDirectory() as directory:
+        if not args.endpoint_url:
+            stack.enter_context(mocks())
+
+        env = Environment(
+            session=botree.Session("us-east-1"),
+            endpoint_url=args.endpoint_url,
+            directory=Path(directory),
+            quick=args.quick,
+        )
+        env.s3().create_bucket(env.bucket_name)
+
+        results = list()
+        for scenarios in SCENARIOS:
+            for scenario in scenarios(env):
+                if args.filter in scenario.name:
+                    results.append(run(scenario, memory=not args.no_memory))
+                    report(results[-1])
+
+        output = {"metadata": metadata(env), "results": [asdict(r) for r in results]}
+        env.session.close()
+
+    if args.output:
+        args.output.write_text(json.dumps(output, indent=2), encoding="utf-8")
+    if args.compare:
+        compare(results, json.loads(args.compare.read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,76 @@
 """Botree - A friendly wrapper for boto3."""
 
-from .core import S3
-from .core import Session
-from .core import Session as session
-from .s3 import S3 as s3
-from .s3 import Bucket
-from .s3 import Bucket as bucket
+import sys
 
+from importlib import import_module
+from types import ModuleType
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import List
 
-__all__ = ["Session", "session", "S3", "s3", "Bucket", "bucket"]
+
+if TYPE_CHECKING:
+    from .aio import AsyncBucket
+    from .aio import AsyncS3
+    from .core import Session
+    from .core import Session as session
+    from .s3 import S3
+    from .s3 import S3 as s3
+    from .s3 import Bucket
+    from .s3 import Bucket as bucket
+
+# Public names and the (module, attribute) they are loaded from on first access
+# (PEP 562), so `import botree` does not import boto3 nor the service modules.
+_LAZY = {
+    "Session": (".core", "Session"),
+    "session": (".core", "Session"),
+    "S3": (".s3", "S3"),
+    "s3": (".s3", "S3"),
+    "Bucket": (".s3", "Bucket"),
+    "bucket": (".s3", "Bucket"),
+    "AsyncS3": (".aio", "AsyncS3"),
+    "AsyncBucket": (".aio", "AsyncBucket"),
+}
+
+
+__all__ = [
+    "Session",
+    "session",
+    "S3",
+    "s3",
+    "Bucket",
+    "bucket",
+    "AsyncS3",
+    "AsyncBucket",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names on first access."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attribute = _LAZY[name]
+    value = getattr(import_module(module, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """List public names, including the not yet imported ones."""
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(ModuleType):
+    """Botree package, whose public aliases win over same-named submodules."""
+
+    def __setattr__(self, name: str, value: Any):
+        """Keep aliases (e.g. `s3`, the S3 class) when a submodule is imported."""
+        if name in _LAZY and isinstance(value, ModuleType):
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
 
 
 # module level doc-string
@@ -0,0 +1,190 @@
+"""Botree asyncio S3 utilities."""
+
+import asyncio
+import functools
+import weakref
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import List
+from typing import Optional
+
+from boto3.session import Session
+from botocore.config import Config
+
+from botree.clients import ClientRegistry
+from botree.s3 import S3
+from botree.s3 import Bucket
+
+
+class _Runner:
+    """Run blocking botree calls from asyncio under a concurrency limit."""
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="botree-aio"
+        )
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """Get the semaphore bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def __call__(self, function: Callable, *args, **kwargs) -> Any:
+        """Await a blocking call, waiting for a free slot first."""
+        async with self.semaphore():
+            loop = asyncio.get_running_loop()
+            call = functools.partial(function, *args, **kwargs)
+            return await loop.run_in_executor(self.executor, call)
+
+    def close(self):
+        """Shut the worker threads down."""
+        self.executor.shutdown(wait=False)
+
+
+class AsyncBucket:
+    """
+    AWS S3 Bucket level transactions, for asyncio.
+
+    Mirrors `Bucket`. Calls are bounded by a semaphore and run on a dedicated
+    thread pool sized like the client connection pool, so one event loop can
+    keep `max_concurrency` requests in flight without blocking.
+    """
+
+    def __init__(self, bucket: Bucket, runner: _Runner):
+        """
+        Async bucket init. Use `AsyncS3.bucket` to build instances.
+
+        Parameters
+        ----------
+        bucket : Bucket
+            Blocking bucket wrapped by this instance.
+        runner : _Runner
+            Shared concurrency limiter and thread pool.
+        """
+        self.bucket = bucket
+        self.name = bucket.name
+        self._run = runner
+
+    async def upload(self, source: Path, target: Path, **kwargs):
+        """Upload a file to S3. See `Bucket.upload`."""
+        await self._run(self.bucket.upload, source, target, **kwargs)
+
+    async def download(self, source: Path, target: Path, **kwargs):
+        """Download a file from S3. See `Bucket.download`."""
+        await self._run(self.bucket.download, source, target, **kwargs)
+
+    async def copy(
+        self, source: Path, target: Path, source_bucket: Optional[str] = None, **kwargs
+    ):
+        """Copy an object. See `Bucket.copy`."""
+        await self._run(self.bucket.copy, source, target, source_bucket, **kwargs)
+
+    async def list_files(
+        self, prefix: str = "", reverse: bool = False, limit: Optional[int] = None
+    ) -> List[str]:
+        """List and sort (by date) all files in a given prefix. See `Bucket.list_files`."""
+        return await self._run(self.bucket.list_files, prefix, reverse, limit)
+
+    async def list_folders(self, prefix: str = "") -> List[str]:
+        """List all folders in a given prefix. See `Bucket.list_folders`."""
+        return await self._run(self.bucket.list_folders, prefix)
+
+    async def paginate_objects(
+        self, prefix: str = "", page_size: int = 1000
+    ) -> AsyncIterator[List[dict]]:
+        """
+        Iterate over object pages, fetching each page without blocking the loop.
+
+        Parameters
+        ----------
+        prefix : str
+            S3 prefix.
+        page_size : int, optional
+            Number of keys requested per page, by default 1000.
+
+        Yields
+        ------
+        List[dict]
+            Objects metadata of each page (empty for empty prefixes).
+        """
+        pages = self.bucket.paginate_objects(prefix, page_size)
+        done = object()
+
+        while True:
+            page = await self._run(next, pages, done)
+            if page is done:
+                return
+            yield page or []
+
+    async def delete(self, target: Path, **kwargs):
+        """Delete a file from S3. See `Bucket.delete`."""
+        await self._run(self.bucket.delete, target, **kwargs)
+
+
+class AsyncS3:
+    """AWS S3 operations, for asyncio."""
+
+    def __init__(
+        self,
+        session: Session,
+        max_concurrency: int = 64,
+        clients: Optional[ClientRegistry] = None,
+        **kwargs,
+    ):
+        """
+        Async S3 class init.
+
+        Parameters
+        ----------
+        session : boto3.Session
+            The authenticated session to be used for S3 operations.
+        max_concurrency : int, optional
+            Maximum number of concurrent requests, shared by all buckets of this
+            instance. The client connection pool is sized accordingly,
+            by default 64.
+        clients : ClientRegistry, optional
+            Registry used to share clients, by default a new one for the session.
+        kwargs : dict, optional
+            Additional parameters passed to the boto3 client.
+        """
+        config = Config(max_pool_connections=max_concurrency)
+        if kwargs.get("config") is not None:
+            config = kwargs["config"].merge(config)
+        kwargs["config"] = config
+
+        self.s3 = S3(session, clients=clients, **kwargs)
+        self._run = _Runner(max_concurrency)
+
+    async def create_bucket(self, name: str, **kwargs):
+        """Create a bucket."""
+        await self._run(self.s3.create_bucket, name, **kwargs)
+
+    async def list_buckets(self) -> List[str]:
+        """Return a list of bucket names."""
+        return await self._run(self.s3.list_buckets)
+
+    def bucket(self, name: str, **kwargs) -> AsyncBucket:
+        """Get an async bucket instance, sharing this instance's limits."""
+        return AsyncBucket(self.s3.bucket(name, **kwargs), self._run)
+
+    def close(self):
+        """Release the worker threads."""
+        self._run.close()
+
+    async def __aenter__(self) -> "AsyncS3":
+        """Use the instance as an async context manager."""
+        return self
+
+    async def __aexit__(self, *exc_info):
+        """Release the worker threads when leaving the context."""
+        self.close()
@@ -0,0 +1,233 @@
+"""Botree boto3 clients and resources registry."""
+
+import threading
+import time
+
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+
+
+if TYPE_CHECKING:
+    from boto3.session import Session
+
+    from botree.metrics import Metrics
+    from botree.ratelimit import RateLimits
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn client kwargs into something usable as a dict key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    try:
+        hash(value)
+    except TypeError:
+        return ("__id__", id(value))
+    return value
+
+
+class ClientRegistry:
+    """
+    Per-session cache of boto3 clients and resources.
+
+    Clients are created lazily, on first request, and then reused by every botree
+    wrapper sharing the registry. Entries are keyed by service name and the
+    keyword arguments passed to boto3, so different configurations (e.g. another
+    endpoint_url) still get their own client.
+    """
+
+    def __init__(
+        self,
+        session: Optional["Session"] = None,
+        session_factory: Optional[Callable[[], "Session"]] = None,
+    ):
+        """
+        Client registry init.
+
+        Parameters
+        ----------
+        session : boto3.Session, optional
+            The authenticated session used to create clients and resources.
+        session_factory : Callable[[], boto3.Session], optional
+            Function building the session on first use, when `session` is not
+            given.
+        """
+        if session is None and session_factory is None:
+            raise ValueError("Either session or session_factory is required.")
+        self._session = session
+        self._session_factory = session_factory
+        self._session_lock = threading.Lock()
+        self._clients: Dict[Tuple, Any] = dict()
+        self._resources: Dict[Tuple, Any] = dict()
+        self._lock = threading.Lock()
+        self.metrics: Optional["Metrics"] = None
+        self.limits: Optional["RateLimits"] = None
+        self._limits_lock = threading.Lock()
+
+    @property
+    def session(self) -> "Session":
+        """The boto3 session, built on first access when created from a factory."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._session_factory()  # type: ignore
+        return self._session  # type: ignore
+
+    def client(self, service_name: str, **kwargs) -> Any:
+        """
+        Get a (cached) boto3 client.
+
+        Parameters
+        ----------
+        service_name : str
+            AWS service name, e.g. 's3' or 'secretsmanager'.
+        kwargs : dict, optional
+            Additional parameters passed to `boto3.Session.client`.
+
+        Returns
+        -------
+        botocore.client.BaseClient
+            Shared client for the given service and parameters.
+        """
+        key = (service_name, _freeze(kwargs))
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create(
+                    service_name,
+                    lambda: self.session.client(service_name=service_name, **kwargs),  # type: ignore
+                    lambda client: client,
+                )
+                self._clients[key] = client
+
+        return client
+
+    def resource(self, service_name: str, **kwargs) -> Any:
+        """
+        Get a (cached) boto3 service resource.
+
+        Parameters
+        ----------
+        service_name : str
+            AWS service name, e.g. 's3'.
+        kwargs : dict, optional
+            Additional parameters passed to `boto3.Session.resource`.
+
+        Returns
+        -------
+        boto3.resources.base.ServiceResource
+            Shared resource for the given service and parameters.
+        """
+        key = (service_name, _freeze(kwargs))
+        resource = self._resources.get(key)
+        if resource is not None:
+            return resource
+
+        with self._lock:
+            resource = self._resources.get(key)
+            if resource is None:
+                resource = self._create(
+                    service_name,
+                    lambda: self.session.resource(service_name, **kwargs),  # type: ignore
+                    lambda resource: resource.meta.client,
+                )
+                self._resources[key] = resource
+
+        return resource
+
+    def _create(
+        self,
+        service_name: str,
+        factory: Callable[[], Any],
+        client_of: Callable[[Any], Any],
+    ) -> Any:
+        """Build a client or resource, timing it and attaching the hooks."""
+        metrics = self.metrics
+        start = time.perf_counter()
+        created = factory()
+        if metrics is not None:
+            metrics.observe(service_name, "CreateClient", time.perf_counter() - start)
+
+        for hook in (metrics, self.limits):
+            if hook is not None:
+                hook.attach(client_of(created))
+        return created
+
+    def _attach(self, hook: Any):
+        """Attach a hook (metrics or limits) to every cached client."""
+        with self._lock:
+            clients = list(self._clients.values())
+            clients += [resource.meta.client for resource in self._resources.values()]
+
+        for client in clients:
+            hook.attach(client)
+
+    def instrument(self, metrics: "Metrics"):
+        """
+        Record the calls of every client of the registry.
+
+        Parameters
+        ----------
+        metrics : Metrics
+            Recorder attached to the cached clients and to the ones created
+            from now on.
+        """
+        self.metrics = metrics
+        self._attach(metrics)
+
+    def rate_limit(self, limits: "RateLimits"):
+        """
+        Enforce client-side rate limits on every client of the registry.
+
+        Parameters
+        ----------
+        limits : RateLimits
+            Limits attached to the cached clients and to the ones created
+            from now on.
+        """
+        self.limits = limits
+        self._attach(limits)
+
+    def rate_limits(self) -> "RateLimits":
+        """Get the registry rate limits, attaching empty ones on first use."""
+        from botree.ratelimit import RateLimits
+
+        with self._limits_lock:
+            if self.limits is None:
+                self.rate_limit(RateLimits())
+        return self.limits  # type: ignore
+
+    def close(self):
+        """Close every cached client and drop them from the registry."""
+        with self._lock:
+            clients = list(self._clients.values())
+            clients += [resource.meta.client for resource in self._resources.values()]
+            self._clients.clear()
+            self._resources.clear()
+
+        for client in clients:
+            close = getattr(client, "close", None)
+            if close is not None:
+                close()
+
+    def __len__(self) -> int:
+        """Number of cached clients and resources."""
+        return len(self._clients) + len(self._resources)
+
+    def __enter__(self) -> "ClientRegistry":
+        """Use the registry as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close all clients when leaving the context."""
+        self.close()
@@ -1,12 +1,28 @@
 """Botree core functions."""
+
+import threading
+
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Callable
+from typing import Dict
 from typing import Optional
 
-from boto3.session import Session as boto_session
+from botree.clients import ClientRegistry
+
 
-from botree.cost_explorer import CostExplorer
-from botree.logs import Logs
-from botree.s3 import S3
-from botree.secrets_manager import SecretsManager
+if TYPE_CHECKING:
+    from boto3.session import Session as boto_session
+
+    from botree.aio import AsyncS3
+    from botree.cost_explorer import CostExplorer
+    from botree.logs import Logs
+    from botree.metrics import CallRecord
+    from botree.metrics import Metrics
+    from botree.ratelimit import RateLimits
+    from botree.ratelimit import TokenBucket
+    from botree.s3 import S3
+    from botree.secrets_manager import SecretsManager
 
 
 class Session:
@@ -25,36 +41,191 @@ class Session:
 
         If not specified, the default credentials (usualy in ~/.aws/credentials)
         are used. Use 'profile' to specify a different AWS profile.
+
+        boto3 clients are created on first use and shared by every service
+        wrapper of this session. Call `close()` (or use the session as a context
+        manager) to release their connection pools.
+
+        boto3 itself is only imported, and the boto3 session only built, on first
+        use, so credentials or profile errors are raised then.
         """
         self.access_key_id = access_key_id
         self.secret_access_key = secret_access_key
         self.session_token = session_token
         self.region = region
         self.profile = profile
-        self.session = boto_session(
-            aws_access_key_id=access_key_id,
-            aws_secret_access_key=secret_access_key,
-            aws_session_token=session_token,
-            region_name=region,
-            profile_name=profile,
-        )
+        self.clients = ClientRegistry(session_factory=lambda: self.session)
+        self._session: Optional["boto_session"] = None
+        self._session_lock = threading.Lock()
+        self._services: Dict[str, Any] = dict()
+        self._services_lock = threading.Lock()
 
     @property
-    def s3(self) -> S3:
+    def session(self) -> "boto_session":
+        """The boto3 session, built on first access."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    from boto3.session import Session as boto_session
+
+                    self._session = boto_session(
+                        aws_access_key_id=self.access_key_id,
+                        aws_secret_access_key=self.secret_access_key,
+                        aws_session_token=self.session_token,
+                        region_name=self.region,
+                        profile_name=self.profile,
+                    )
+        return self._session
+
+    def _service(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Get a service wrapper, building it only once per session."""
+        service = self._services.get(name)
+        if service is not None:
+            return service
+
+        with self._services_lock:
+            service = self._services.get(name)
+            if service is None:
+                service = factory()
+                self._services[name] = service
+
+        return service
+
+    @property
+    def s3(self) -> "S3":
         """Get a S3 instance."""
-        return S3(self.session)
+        from botree.s3 import S3
+
+        return self._service("s3", lambda: S3(self.session, clients=self.clients))
+
+    @property
+    def async_s3(self) -> "AsyncS3":
+        """Get an AsyncS3 instance."""
+        from botree.aio import AsyncS3
+
+        return self._service(
+            "async_s3", lambda: AsyncS3(self.session, clients=self.clients)
+        )
 
     @property
-    def secrets_manager(self) -> SecretsManager:
+    def secrets_manager(self) -> "SecretsManager":
         """Get a SecretsManager instance."""
-        return SecretsManager(self.session)
+        from botree.secrets_manager import SecretsManager
+
+        return self._service(
+            "secretsmanager",
+            lambda: SecretsManager(self.session, clients=self.clients),
+        )
 
     @property
-    def cost_explorer(self) -> CostExplorer:
+    def cost_explorer(self) -> "CostExplorer":
         """Get a CostExplorer instance."""
-        return CostExplorer(self.session)
+        from botree.cost_explorer import CostExplorer
+
+        return self._service(
+            "ce", lambda: CostExplorer(self.session, clients=self.clients)
+        )
 
     @property
-    def logs(self) -> Logs:
+    def logs(self) -> "Logs":
         """Get a Logs instance."""
-        return Logs(self.session)
+        from botree.logs import Logs
+
+        return self._service("logs", lambda: Logs(self.session, clients=self.clients))
+
+    def instrument(self, *sinks: Callable[["CallRecord"], Any]) -> "Metrics":
+        """
+        Record the calls of every boto3 client of this session.
+
+        Hooks botocore's event system to count calls, retries, throttles and
+        bytes, and time them per service and operation. Clients are not
+        instrumented until this is called, so there is no overhead otherwise.
+
+        Parameters
+        ----------
+        sinks : Callable[[CallRecord], Any], optional
+            Functions called with the record of every call, e.g. a
+            `botree.metrics.LoggingSink` or a StatsD/Prometheus adapter.
+
+        Returns
+        -------
+        Metrics
+            The session recorder. Use `Metrics.snapshot` to read the totals.
+            Further calls add sinks to the same recorder.
+        """
+        from botree.metrics import Metrics
+
+        metrics = self.clients.metrics
+        if metrics is None:
+            metrics = Metrics()
+            self.clients.instrument(metrics)
+        metrics.sinks.extend(sinks)
+        return metrics
+
+    def rate_limit(self, service_name: str, max_rate: float, **kwargs) -> "TokenBucket":
+        """
+        Limit the request rate of a service, for every client of this session.
+
+        All threads and botree wrappers share one token bucket per service, so
+        concurrent callers back off together instead of independently. The
+        rate adapts to throttling responses (AIMD), below `max_rate`.
+
+        Parameters
+        ----------
+        service_name : str
+            AWS service name, e.g. 'secretsmanager' or 's3'.
+        max_rate : float
+            Rate ceiling, in requests per second.
+        kwargs : dict, optional
+            Additional parameters passed to `botree.ratelimit.TokenBucket`
+            (rate, min_rate, increase, decrease, cooldown).
+
+        Returns
+        -------
+        TokenBucket
+            The service bucket, e.g. to read its current `rate`.
+        """
+        return self.clients.rate_limits().limit(service_name, max_rate, **kwargs)
+
+    def rate_limit_s3_prefixes(
+        self, read_rate: float = 5500.0, write_rate: float = 3500.0
+    ) -> "RateLimits":
+        """
+        Limit S3 requests per bucket prefix, as S3 does (3,500/5,500 req/s).
+
+        Parameters
+        ----------
+        read_rate : float, optional
+            GET/HEAD ceiling per prefix, by default 5500.
+        write_rate : float, optional
+            PUT/COPY/POST/DELETE ceiling per prefix, by default 3500.
+
+        Returns
+        -------
+        RateLimits
+            The session rate limits.
+        """
+        limits = self.clients.rate_limits()
+        limits.limit_s3_prefixes(read_rate, write_rate)
+        return limits
+
+    def close(self):
+        """Close all boto3 clients and service wrappers created by this session."""
+        with self._services_lock:
+            services = list(self._services.values())
+            self._services.clear()
+
+        for service in services:
+            close = getattr(service, "close", None)
+            if close is not None:
+                close()
+
+        self.clients.close()
+
+    def __enter__(self) -> "Session":
+        """Use the session as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close all clients when leaving the context."""
+        self.close()
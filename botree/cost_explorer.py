@@ -1,10 +1,210 @@
 """Botree Cost Explorer utilities."""
 
+import hashlib
+import json
+import os
+import time
+
+from datetime import date
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Union
+
+from botree.clients import ClientRegistry
+from botree.utils import FileLock
+from botree.utils import bounded_map
+from botree.utils import to_frame
+
+
+def _period_closed(params: Dict[str, Any], today: Optional[date] = None) -> bool:
+    """Tell if a request only covers months before the current one."""
+    end = params.get("TimePeriod", {}).get("End")
+    if not end:
+        return False
+    today = today or date.today()
+    return end[:10] <= today.replace(day=1).isoformat()
+
+
+def _merge_page(response: Dict[str, Any], page: Dict[str, Any]):
+    """Merge a get_cost_and_usage page into the first one, in place."""
+    periods = {
+        (result["TimePeriod"]["Start"], result["TimePeriod"]["End"]): result
+        for result in response.get("ResultsByTime", [])
+    }
+
+    for result in page.get("ResultsByTime", []):
+        period = (result["TimePeriod"]["Start"], result["TimePeriod"]["End"])
+        if period in periods:
+            merged = periods[period]
+            merged["Groups"] = merged.get("Groups", []) + result.get("Groups", [])
+        else:
+            periods[period] = result
+            response.setdefault("ResultsByTime", []).append(result)
+
+    if page.get("DimensionValueAttributes"):
+        response.setdefault("DimensionValueAttributes", [])
+        response["DimensionValueAttributes"] += page["DimensionValueAttributes"]
+
+
+def _month_windows(
+    time_period: Dict[str, str], months: int = 1
+) -> List[Dict[str, str]]:
+    """Split a time period ('YYYY-MM-DD' dates) into calendar month windows."""
+    start = date.fromisoformat(time_period["Start"][:10])
+    end = date.fromisoformat(time_period["End"][:10])
+    windows = list()
+
+    while start < end:
+        month = start.month - 1 + months
+        boundary = date(start.year + month // 12, month % 12 + 1, 1)
+        window_end = min(end, boundary)
+        windows.append({"Start": start.isoformat(), "End": window_end.isoformat()})
+        start = window_end
+
+    return windows
+
+
+def _cost_columns(
+    responses: Iterable[Dict[str, Any]], keys: List[str]
+) -> Dict[str, List[Any]]:
+    """Flatten get_cost_and_usage responses to date, group keys, metric, amount."""
+    columns: Dict[str, List[Any]] = {
+        name: list() for name in ["date", *keys, "metric", "amount"]
+    }
+
+    for response in responses:
+        for result in response.get("ResultsByTime", []):
+            day = date.fromisoformat(result["TimePeriod"]["Start"][:10])
+            groups = result.get("Groups", [])
+            if not keys:
+                groups = [{"Keys": [], "Metrics": result.get("Total", {})}]
+
+            for group in groups:
+                for metric, value in group.get("Metrics", {}).items():
+                    columns["date"].append(day)
+                    for key, group_key in zip(keys, group["Keys"]):
+                        columns[key].append(group_key)
+                    columns["metric"].append(metric)
+                    columns["amount"].append(float(value["Amount"]))
+
+    return columns
+
+
+def _forecast_columns(
+    responses: Iterable[Dict[str, Any]], metric: str
+) -> Dict[str, List[Any]]:
+    """Flatten get_cost_forecast responses to date, metric, amount and bounds."""
+    columns: Dict[str, List[Any]] = {
+        name: list() for name in ("date", "metric", "amount", "lower", "upper")
+    }
+
+    for response in responses:
+        for result in response.get("ForecastResultsByTime", []):
+            lower = result.get("PredictionIntervalLowerBound")
+            upper = result.get("PredictionIntervalUpperBound")
+            columns["date"].append(
+                date.fromisoformat(result["TimePeriod"]["Start"][:10])
+            )
+            columns["metric"].append(metric)
+            columns["amount"].append(float(result["MeanValue"]))
+            columns["lower"].append(None if lower is None else float(lower))
+            columns["upper"].append(None if upper is None else float(upper))
+
+    return columns
+
+
+class CostCache:
+    """
+    Persistent disk cache of Cost Explorer responses.
+
+    Entries are keyed by operation and normalized request parameters. Requests
+    ending before the current month cover closed periods and never expire, the
+    others (current month, forecasts) expire after `ttl` seconds. Per-entry lock
+    files make concurrent callers (threads or processes) share a single request.
+    Use one directory per account, as credentials are not part of the key.
+    """
+
+    def __init__(self, directory: Union[str, Path], ttl: float = 3600.0):
+        """
+        Cost cache init.
+
+        Parameters
+        ----------
+        directory : Union[str, Path]
+            Cache directory, may be shared by several processes.
+        ttl : float, optional
+            Time to live of entries covering open periods, in seconds,
+            by default 3600.
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _entry(self, operation: str, params: Dict[str, Any]) -> Path:
+        """Entry file path of a request."""
+        normalized = dict(params)
+        if "Metrics" in normalized:
+            normalized["Metrics"] = sorted(normalized["Metrics"])
+        key = json.dumps([operation, normalized], sort_keys=True, default=str)
+        return self.directory / (hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def get(
+        self, operation: str, params: Dict[str, Any], call: Callable[[], Dict]
+    ) -> Dict[str, Any]:
+        """
+        Get a cached response, or call the API and cache its response.
+
+        Parameters
+        ----------
+        operation : str
+            Operation name, part of the cache key.
+        params : Dict[str, Any]
+            Request parameters.
+        call : Callable[[], Dict]
+            Function requesting the (complete) response.
+
+        Returns
+        -------
+        Dict[str, Any]
+            The response.
+        """
+        entry = self._entry(operation, params)
+
+        with FileLock(entry.with_suffix(".lock")):
+            if entry.is_file():
+                cached = json.loads(entry.read_text(encoding="utf-8"))
+                if cached["expires"] is None or cached["expires"] > time.time():
+                    self.hits += 1
+                    return cached["response"]
+
+            self.misses += 1
+            response = call()
+            expires = None if _period_closed(params) else time.time() + self.ttl
+
+            temp = entry.with_suffix(".tmp")
+            content = {"expires": expires, "response": response}
+            temp.write_text(json.dumps(content, default=str), encoding="utf-8")
+            os.replace(temp, entry)
+
+        return response
+
 
 class CostExplorer:
     """AWS Cost Explorer operations."""
 
-    def __init__(self, session):
+    def __init__(
+        self,
+        session,
+        client_kwargs: dict = dict(),
+        clients: Optional[ClientRegistry] = None,
+    ):
         """
         Cost Explorer class init.
 
@@ -12,14 +212,67 @@ class CostExplorer:
         ----------
         session : boto3.Session
             The authenticated session to be used for Cost Explorer operations.
+        client_kwargs : dict, optional
+            Additional parameters passed to the boto3 client, by default {}.
+        clients : ClientRegistry, optional
+            Registry used to share clients, by default a new one for the session.
         """
         self.session = session
-        self.client = self.session.client(service_name="ce")
+        self.client_kwargs = client_kwargs
+        self.clients = clients if clients is not None else ClientRegistry(session)
+        self.cache: Optional[CostCache] = None
+
+    @property
+    def client(self):
+        """Shared Cost Explorer client, created on first use."""
+        return self.clients.client("ce", **self.client_kwargs)
+
+    def enable_cache(
+        self, directory: Union[str, Path], ttl: float = 3600.0
+    ) -> CostCache:
+        """
+        Cache `get_costs` and `get_forecasts` responses on disk.
+
+        Parameters
+        ----------
+        directory : Union[str, Path]
+            Cache directory.
+        ttl : float, optional
+            Time to live of responses covering the current month (or the
+            future), in seconds, by default 3600. Closed periods never expire.
+
+        Returns
+        -------
+        CostCache
+            The new cache.
+        """
+        self.cache = CostCache(directory, ttl=ttl)
+        return self.cache
+
+    def _request(self, operation: str, params: Dict[str, Any], call: Callable):
+        """Run a request through the cache, if enabled."""
+        if self.cache is None:
+            return call()
+        return self.cache.get(operation, params, call)
+
+    def _paginate_costs(self, **params) -> Dict[str, Any]:
+        """Request all get_cost_and_usage pages and merge them."""
+        response = self.client.get_cost_and_usage(**params)
+        token = response.pop("NextPageToken", None)
+
+        while token:
+            page = self.client.get_cost_and_usage(**params, NextPageToken=token)
+            _merge_page(response, page)
+            token = page.get("NextPageToken")
+
+        return response
 
     def get_costs(self, time_period, granularity, metrics, **kwargs):
         """
         Get cost and usage data.
 
+        Follows `NextPageToken`, merging the `ResultsByTime` of all pages.
+
         Parameters
         ----------
         time_period : dict
@@ -39,10 +292,12 @@ class CostExplorer:
         dict
             The response containing cost and usage data.
         """
-        response = self.client.get_cost_and_usage(
+        params = dict(
             TimePeriod=time_period, Granularity=granularity, Metrics=metrics, **kwargs
         )
-        return response
+        return self._request(
+            "get_cost_and_usage", params, lambda: self._paginate_costs(**params)
+        )
 
     def get_forecasts(self, time_period, granularity, metric, **kwargs):
         """
@@ -66,7 +321,142 @@ class CostExplorer:
         dict
             The response containing the cost forecast data.
         """
-        response = self.client.get_cost_forecast(
+        params = dict(
             TimePeriod=time_period, Granularity=granularity, Metric=metric, **kwargs
         )
-        return response
+        return self._request(
+            "get_cost_forecast",
+            params,
+            lambda: self.client.get_cost_forecast(**params),
+        )
+
+    def _fan_out(
+        self,
+        function: Callable[[Dict[str, str]], Dict[str, Any]],
+        time_period: Dict[str, str],
+        window_months: int,
+        max_workers: int,
+        rate: Optional[float],
+    ) -> List[Dict[str, Any]]:
+        """Call `function` for every window of a period, in parallel and in order."""
+        if rate is not None:
+            self.clients.rate_limits().setdefault("ce", rate)
+
+        windows = _month_windows(time_period, window_months)
+        responses: Dict[str, Dict[str, Any]] = dict()
+        for window, response, error in bounded_map(function, windows, max_workers):
+            if error is not None:
+                raise error
+            responses[window["Start"]] = response
+
+        return [responses[window["Start"]] for window in windows]
+
+    def get_costs_table(
+        self,
+        time_period: Dict[str, str],
+        granularity: str,
+        metrics: List[str],
+        window_months: int = 1,
+        max_workers: int = 4,
+        rate: Optional[float] = 5.0,
+        backend: Optional[str] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Get cost and usage data as a table, fetching time windows concurrently.
+
+        The period is split into calendar month windows, requested in parallel
+        through `get_costs` (so windows are paginated and, once closed, cached).
+
+        Parameters
+        ----------
+        time_period : Dict[str, str]
+            The time period, with 'YYYY-MM-DD' dates.
+            Example: {'Start': '2023-01-01', 'End': '2024-01-01'}
+        granularity : str
+            The granularity of the returned data. Valid values: DAILY, MONTHLY
+        metrics : List[str]
+            The metrics to retrieve. Example: ['UnblendedCost']
+        window_months : int, optional
+            Number of months per request, by default 1.
+        max_workers : int, optional
+            Number of concurrent requests, by default 4.
+        rate : Optional[float], optional
+            Maximum number of requests per second, by default 5. It sets up the
+            shared, adaptive 'ce' token bucket of the client registry, unless a
+            limit is already set (e.g. by `Session.rate_limit('ce', ...)`).
+            None sends requests without limit.
+        backend : Optional[str], optional
+            Return a 'pandas' DataFrame or a 'pyarrow' Table instead of columns,
+            by default None.
+        kwargs : dict, optional
+            Additional parameters passed to `get_costs`, e.g. GroupBy.
+
+        Returns
+        -------
+        Dict[str, List[Any]] or pandas.DataFrame or pyarrow.Table
+            'date', one column per GroupBy key, 'metric' and 'amount' (float).
+        """
+        responses = self._fan_out(
+            lambda window: self.get_costs(window, granularity, metrics, **kwargs),
+            time_period,
+            window_months,
+            max_workers,
+            rate,
+        )
+        keys = [group["Key"] for group in kwargs.get("GroupBy", [])]
+        columns = _cost_columns(responses, keys)
+        return columns if backend is None else to_frame(columns, backend)
+
+    def get_forecasts_table(
+        self,
+        time_period: Dict[str, str],
+        granularity: str,
+        metric: str,
+        window_months: int = 1,
+        max_workers: int = 4,
+        rate: Optional[float] = 5.0,
+        backend: Optional[str] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Get cost forecasts as a table, fetching time windows concurrently.
+
+        Parameters
+        ----------
+        time_period : Dict[str, str]
+            The time period, with 'YYYY-MM-DD' dates.
+        granularity : str
+            The granularity of the forecast. Valid values: DAILY, MONTHLY
+        metric : str
+            The forecast metric to retrieve. Example: 'UnblendedCost'
+        window_months : int, optional
+            Number of months per request, by default 1.
+        max_workers : int, optional
+            Number of concurrent requests, by default 4.
+        rate : Optional[float], optional
+            Maximum number of requests per second, by default 5. It sets up the
+            shared, adaptive 'ce' token bucket of the client registry, unless a
+            limit is already set (e.g. by `Session.rate_limit('ce', ...)`).
+            None sends requests without limit.
+        backend : Optional[str], optional
+            Return a 'pandas' DataFrame or a 'pyarrow' Table instead of columns,
+            by default None.
+        kwargs : dict, optional
+            Additional parameters passed to `get_forecasts`.
+
+        Returns
+        -------
+        Dict[str, List[Any]] or pandas.DataFrame or pyarrow.Table
+            'date', 'metric', 'amount' and the prediction interval ('lower',
+            'upper', None when not requested).
+        """
+        responses = self._fan_out(
+            lambda window: self.get_forecasts(window, granularity, metric, **kwargs),
+            time_period,
+            window_months,
+            max_workers,
+            rate,
+        )
+        columns = _forecast_columns(responses, metric)
+        return columns if backend is None else to_frame(columns, backend)
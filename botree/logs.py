@@ -1,10 +1,706 @@
 """Botree AWS Logs utilities."""
 
+import gzip
+import json
+import logging
+import math
+import os
+import queue
+import threading
+import time
+
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Union
+
+from botocore.exceptions import ClientError
+
+from botree.clients import ClientRegistry
+from botree.utils import backoff
+from botree.utils import interleave
+from botree.utils import to_frame
+
+
+MAX_CONCURRENT_QUERIES = 30
+"""Default CloudWatch Logs Insights concurrent queries quota."""
+
+MAX_QUERY_ROWS = 10000
+"""Maximum number of rows returned by a Logs Insights query."""
+
+PUT_MAX_BYTES = 1048576
+"""Maximum PutLogEvents batch size, in bytes."""
+
+PUT_MAX_EVENTS = 10000
+"""Maximum number of events of a PutLogEvents batch."""
+
+PUT_EVENT_OVERHEAD = 26
+"""Bytes added to the message length of each event, for batch size limits."""
+
+PUT_MAX_EVENT_BYTES = 262144
+"""Maximum size of a single event, overhead included, in bytes."""
+
+PUT_MAX_SPAN = 24 * 3600 * 1000
+"""Maximum time span of a PutLogEvents batch, in milliseconds."""
+
+THROTTLING_ERRORS = {"ThrottlingException", "ServiceUnavailableException"}
+"""Error codes retried by `LogWriter`."""
+
+_TICK = object()
+_CLOSE = object()
+
+
+class QueryError(Exception):
+    """A Logs Insights query failed, was cancelled or timed out."""
+
+
+def _collect_finished(
+    running: Dict[int, "Query"], results: List[Any], return_exceptions: bool
+):
+    """Move finished queries from `running` to their `results` slot."""
+    for index, query in list(running.items()):
+        try:
+            if not query.done():
+                continue
+            results[index] = query.response
+        except QueryError as error:
+            if not return_exceptions:
+                raise
+            results[index] = error
+        del running[index]
+
+
+class Query:
+    """
+    Handle to a running CloudWatch Logs Insights query.
+
+    Results are polled with exponential backoff and jitter, so waiting on a
+    query costs a few API calls instead of a busy loop.
+    """
+
+    def __init__(
+        self,
+        client,
+        query_id: str,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 10.0,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Query init. Use `Logs.start_query` to build instances.
+
+        Parameters
+        ----------
+        client : botocore.client.BaseClient
+            CloudWatch Logs client.
+        query_id : str
+            Logs Insights query id.
+        poll_interval : float, optional
+            First polling delay, in seconds, by default 0.5.
+        max_poll_interval : float, optional
+            Largest polling delay, in seconds, by default 10.
+        timeout : Optional[float], optional
+            Maximum query duration, in seconds. The query is stopped when it
+            expires, by default None (no limit).
+        """
+        self.client = client
+        self.query_id = query_id
+        self.response: Optional[Dict[str, Any]] = None
+        self._delays = backoff(poll_interval, max_poll_interval)
+        self._next_poll = 0.0
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+
+    @property
+    def status(self) -> str:
+        """Last known query status ('Scheduled' before the first poll)."""
+        return self.response["status"] if self.response else "Scheduled"
+
+    def poll(self) -> bool:
+        """
+        Fetch the query status once.
+
+        Returns
+        -------
+        bool
+            True if the query completed.
+
+        Raises
+        ------
+        QueryError
+            If the query failed or was cancelled.
+        """
+        self.response = self.client.get_query_results(queryId=self.query_id)
+        self._next_poll = time.monotonic() + next(self._delays)
+
+        if self.status in ("Failed", "Cancelled", "Timeout"):
+            raise QueryError(
+                f"Query execution failed or was cancelled. Status: {self.status}"
+            )
+
+        return self.status == "Complete"
+
+    def done(self) -> bool:
+        """
+        Tell if the query completed, polling only when its backoff elapsed.
+
+        Raises
+        ------
+        QueryError
+            If the query failed, was cancelled or timed out (it is then stopped).
+        """
+        if self.status == "Complete":
+            return True
+
+        now = time.monotonic()
+        if self.deadline is not None and now >= self.deadline:
+            self.cancel()
+            raise QueryError(f"Query {self.query_id} timed out.")
+        if now < self._next_poll:
+            return False
+
+        return self.poll()
+
+    @property
+    def next_check(self) -> float:
+        """Monotonic time of the next useful `done()` call."""
+        if self.deadline is None:
+            return self._next_poll
+        return min(self._next_poll, self.deadline)
+
+    def result(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Wait for the query results.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximum wait, in seconds. The query is stopped when it expires,
+            by default None (wait forever).
+
+        Returns
+        -------
+        Dict[str, Any]
+            The get_query_results response.
+
+        Raises
+        ------
+        QueryError
+            If the query failed, was cancelled or timed out.
+        """
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+            self.deadline = min(deadline, self.deadline or deadline)
+
+        while not self.done():
+            time.sleep(max(0.0, self.next_check - time.monotonic()))
+
+        return self.response  # type: ignore
+
+    def cancel(self):
+        """Stop the query. Already finished queries are left untouched."""
+        try:
+            self.client.stop_query(queryId=self.query_id)
+        except ClientError as error:
+            if error.response["Error"]["Code"] != "InvalidParameterException":
+                raise
+
+
+class ExportCheckpoint:
+    """
+    Resume tokens of a log events export, persisted to a JSON file.
+
+    Readers stage the token of a page once its events were handed to the
+    consumer. Staged tokens are saved right away (`autocommit`) when events are
+    consumed directly, or by `Logs.export_events` only after the events they
+    cover were flushed to disk, along with the output file size. A resumed
+    export may repeat the last page but never skips events.
+    """
+
+    DONE = "__done__"
+    OFFSET = "__offset__"
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Export checkpoint init.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            JSON file where tokens are stored. Created if missing.
+        """
+        self.path = Path(path)
+        self.autocommit = True
+        self._lock = threading.Lock()
+        self.tokens: Dict[str, str] = dict()
+        self.pending: Dict[str, str] = dict()
+        if self.path.is_file():
+            self.tokens = json.loads(self.path.read_text(encoding="utf-8"))
+
+    @property
+    def offset(self) -> Optional[int]:
+        """Size of the export file when the tokens were last saved, if known."""
+        offset = self.tokens.get(self.OFFSET)
+        return None if offset is None else int(offset)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the resume token of a log group or stream."""
+        with self._lock:
+            return self.tokens.get(key)
+
+    def stage(self, key: str, token: str):
+        """Stage the resume token of a log group or stream."""
+        with self._lock:
+            self.pending[key] = token
+        if self.autocommit:
+            self.commit()
+
+    def commit(self, offset: Optional[int] = None):
+        """
+        Save the staged tokens.
+
+        Parameters
+        ----------
+        offset : Optional[int], optional
+            Size of the export file holding every event covered by the tokens,
+            by default None.
+        """
+        with self._lock:
+            self.tokens.update(self.pending)
+            self.pending.clear()
+            if offset is not None:
+                self.tokens[self.OFFSET] = str(offset)
+
+            temp = self.path.with_name(self.path.name + ".tmp")
+            with open(temp, "w", encoding="utf-8") as file:
+                json.dump(self.tokens, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp, self.path)
+
+    def set(self, key: str, token: str):
+        """Save the resume token of a log group or stream."""
+        with self._lock:
+            self.pending[key] = token
+        self.commit()
+
+
+class _PageEnd:
+    """Marker following the events of a page: the token resuming after them."""
+
+    __slots__ = ("key", "token")
+
+    def __init__(self, key: str, token: str):
+        self.key = key
+        self.token = token
+
+
+def _staged(
+    items: Iterable[Any], tokens: Optional[ExportCheckpoint]
+) -> Iterator[Dict[str, Any]]:
+    """Yield events, staging resume tokens once their page was consumed."""
+    for item in items:
+        if isinstance(item, _PageEnd):
+            tokens.stage(item.key, item.token)  # type: ignore
+        else:
+            yield item
+
+
+class _Shard:
+    """A time range of a sharded query and its state."""
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.query: Optional[Query] = None
+        self.rows: Optional[List[Any]] = None
+
+
+class _ShardedQuery:
+    """Run time shards concurrently, splitting the ones hitting the row cap."""
+
+    def __init__(
+        self,
+        start_query: Callable[[int, int], Query],
+        shards: List[_Shard],
+        max_concurrent: int,
+        max_rows: int,
+        min_shard: int,
+    ):
+        self.start_query = start_query
+        self.shards = shards
+        self.max_concurrent = max_concurrent
+        self.max_rows = max_rows
+        self.min_shard = min_shard
+
+    def running(self) -> List[_Shard]:
+        """Shards whose query was started but did not finish."""
+        return [s for s in self.shards if s.query is not None and s.rows is None]
+
+    def start_pending(self):
+        """Start the earliest shards, up to the concurrency limit."""
+        available = self.max_concurrent - len(self.running())
+        for shard in self.shards:
+            if available <= 0:
+                break
+            if shard.query is None:
+                shard.query = self.start_query(shard.start, shard.end)
+                available -= 1
+
+    def poll(self):
+        """Collect finished shards, splitting the truncated ones in two."""
+        for shard in self.running():
+            if not shard.query.done():  # type: ignore
+                continue
+
+            rows = shard.query.response["results"]  # type: ignore
+            if len(rows) < self.max_rows or shard.end - shard.start < self.min_shard:
+                shard.rows = rows
+                continue
+
+            middle = (shard.start + shard.end) // 2
+            index = self.shards.index(shard)
+            self.shards[index : index + 1] = [
+                _Shard(shard.start, middle),
+                _Shard(middle + 1, shard.end),
+            ]
+
+    def __iter__(self) -> Iterator[Any]:
+        """Yield rows shard by shard, as soon as leading shards are done."""
+        try:
+            while self.shards:
+                self.start_pending()
+                self.poll()
+
+                while self.shards and self.shards[0].rows is not None:
+                    yield from self.shards.pop(0).rows  # type: ignore
+
+                running = self.running()
+                if running and (not self.shards or self.shards[0].rows is None):
+                    next_check = min(s.query.next_check for s in running)  # type: ignore
+                    time.sleep(max(0.0, next_check - time.monotonic()))
+        finally:
+            for shard in self.running():
+                shard.query.cancel()  # type: ignore
+
+
+def _throttled(error: BaseException) -> bool:
+    """Tell if an error is a retryable throttling error."""
+    if not isinstance(error, ClientError):
+        return False
+    return error.response.get("Error", {}).get("Code") in THROTTLING_ERRORS
+
+
+def _rejected(info: Dict[str, int], count: int) -> int:
+    """Number of events of a batch rejected by PutLogEvents."""
+    # Events before the end indexes and from the start index on are rejected
+    too_old = max(
+        info.get("tooOldLogEventEndIndex", 0), info.get("expiredLogEventEndIndex", 0)
+    )
+    too_new = max(too_old, info.get("tooNewLogEventStartIndex", count))
+    return min(count, too_old + count - too_new)
+
+
+def _event_size(event: Dict[str, Any]) -> int:
+    """Size of an event for PutLogEvents: UTF-8 message length plus overhead."""
+    return len(event["message"].encode("utf-8")) + PUT_EVENT_OVERHEAD
+
+
+def _truncate(message: str) -> str:
+    """Cut a message to the PutLogEvents event size limit, on a UTF-8 boundary."""
+    limit = PUT_MAX_EVENT_BYTES - PUT_EVENT_OVERHEAD
+    encoded = message.encode("utf-8")
+    if len(encoded) <= limit:
+        return message
+    return encoded[:limit].decode("utf-8", "ignore")
+
+
+def _put_batches(events: List[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Sort events by timestamp and split them into valid PutLogEvents batches.
+
+    Batches hold at most `PUT_MAX_EVENTS` events and `PUT_MAX_BYTES` bytes,
+    and never span more than 24 hours.
+    """
+    batch: List[Dict[str, Any]] = list()
+    size = 0
+
+    for event in sorted(events, key=lambda event: event["timestamp"]):
+        event_size = _event_size(event)
+        if batch and (
+            len(batch) >= PUT_MAX_EVENTS
+            or size + event_size > PUT_MAX_BYTES
+            or event["timestamp"] - batch[0]["timestamp"] >= PUT_MAX_SPAN
+        ):
+            yield batch
+            batch, size = list(), 0
+        batch.append(event)
+        size += event_size
+
+    if batch:
+        yield batch
+
+
+class LogWriter:
+    """
+    Buffered CloudWatch Logs writer.
+
+    Events are queued by `put` and shipped by a background thread, which
+    flushes whenever a full PutLogEvents batch (1 MB or 10,000 events) is
+    buffered, or `flush_interval` seconds after the first buffered event.
+    Throttled requests are retried with exponential backoff. Events rejected
+    by the service (too old, too new or expired) are counted as failed. Use
+    `Logs.writer` to build instances.
+    """
+
+    def __init__(
+        self,
+        client,
+        log_group_name: str,
+        log_stream_name: str,
+        flush_interval: float = 1.0,
+        max_queue: int = 100000,
+        max_retries: int = 5,
+    ):
+        """
+        Log writer init. Starts the background thread.
+
+        Parameters
+        ----------
+        client : botocore.client.BaseClient
+            CloudWatch Logs client.
+        log_group_name : str
+            Target log group.
+        log_stream_name : str
+            Target log stream.
+        flush_interval : float, optional
+            Maximum time an event waits in the buffer, in seconds, by default 1.
+        max_queue : int, optional
+            Maximum number of queued events. `put` drops (or blocks on) new
+            events while the queue is full, by default 100000.
+        max_retries : int, optional
+            Retries of a throttled request before its events are given up,
+            by default 5.
+        """
+        self.client = client
+        self.log_group_name = log_group_name
+        self.log_stream_name = log_stream_name
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.last_error: Optional[BaseException] = None
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._pending: List[Dict[str, Any]] = list()
+        self._size = 0
+        self._deadline: Optional[float] = None
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="botree-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def put(
+        self, message: str, timestamp: Optional[int] = None, block: bool = False
+    ) -> bool:
+        """
+        Queue an event.
+
+        Parameters
+        ----------
+        message : str
+            Event message.
+        timestamp : int, optional
+            Event time, in milliseconds since the epoch, by default now.
+        block : bool, optional
+            Wait for room when the queue is full instead of dropping the event,
+            by default False.
+
+        Returns
+        -------
+        bool
+            Whether the event was queued. Empty messages, which PutLogEvents
+            rejects, are counted as failed instead. Messages above the 256 KB
+            event limit are truncated.
+        """
+        if self._closed:
+            raise ValueError("put on a closed LogWriter.")
+        if not message:
+            self.failed += 1
+            self.last_error = ValueError("Empty log event message.")
+            return False
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+
+        try:
+            event = {"timestamp": timestamp, "message": _truncate(message)}
+            self._queue.put(event, block)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ship every event queued so far and wait for it.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum time to wait, in seconds, by default no limit.
+
+        Returns
+        -------
+        bool
+            Whether the flush finished within `timeout`.
+        """
+        if not self._thread.is_alive():
+            return True
+        flushed = threading.Event()
+        self._queue.put(flushed)
+        return flushed.wait(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush remaining events and stop the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join(timeout)
+
+    def _next(self) -> Any:
+        """Get the next queued item, or `_TICK` when the flush interval is over."""
+        timeout = None
+        if self._deadline is not None:
+            timeout = max(0.0, self._deadline - time.monotonic())
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return _TICK
+
+    def _run(self):
+        """Background loop: buffer events and ship them in batches."""
+        while True:
+            item = self._next()
+            if isinstance(item, dict):
+                self._add(item)
+                continue
+
+            self._send()
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _CLOSE:
+                return
+
+    def _add(self, event: Dict[str, Any]):
+        """Buffer an event, shipping the buffer when a batch is full."""
+        if not self._pending:
+            self._deadline = time.monotonic() + self.flush_interval
+        self._pending.append(event)
+        self._size += _event_size(event)
+
+        if len(self._pending) >= PUT_MAX_EVENTS or self._size >= PUT_MAX_BYTES:
+            self._send()
+
+    def _send(self):
+        """Ship all buffered events."""
+        events, self._pending, self._size, self._deadline = self._pending, [], 0, None
+        for batch in _put_batches(events):
+            self._put(batch)
+
+    def _put(self, batch: List[Dict[str, Any]]):
+        """Send a batch, retrying throttling errors with backoff."""
+        delays = backoff()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.put_log_events(
+                    logGroupName=self.log_group_name,
+                    logStreamName=self.log_stream_name,
+                    logEvents=batch,
+                )
+                info = (response or {}).get("rejectedLogEventsInfo")
+                rejected = _rejected(info, len(batch)) if info else 0
+                self.sent += len(batch) - rejected
+                if rejected:
+                    self.failed += rejected
+                    self.last_error = ValueError(
+                        f"{rejected} log events rejected: {info}"
+                    )
+                return
+            except Exception as error:
+                if not _throttled(error) or attempt == self.max_retries:
+                    self.failed += len(batch)
+                    self.last_error = error
+                    return
+            time.sleep(next(delays))
+
+    def __enter__(self) -> "LogWriter":
+        """Use the writer as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Flush and stop the writer when leaving the context."""
+        self.close()
+
+
+class LogHandler(logging.Handler):
+    """
+    `logging.Handler` shipping records to CloudWatch Logs through a `LogWriter`.
+
+    `emit` only queues the formatted record, so logging calls never wait on
+    the network. Records are dropped, and counted in `LogWriter.dropped`, when
+    the writer queue is full.
+    """
+
+    def __init__(self, writer: LogWriter, level: int = logging.NOTSET):
+        """
+        Log handler init.
+
+        Parameters
+        ----------
+        writer : LogWriter
+            Writer receiving the records.
+        level : int, optional
+            Handler level, by default logging.NOTSET.
+        """
+        super().__init__(level)
+        self.writer = writer
+
+    def emit(self, record: logging.LogRecord):
+        """Queue a formatted record."""
+        try:
+            self.writer.put(self.format(record), int(record.created * 1000))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        """Ship queued records."""
+        self.writer.flush()
+
+    def close(self):
+        """Flush and stop the writer."""
+        self.writer.close()
+        super().close()
+
 
 class Logs:
     """AWS CloudWatch Logs operations."""
 
-    def __init__(self, session):
+    def __init__(
+        self,
+        session,
+        client_kwargs: dict = dict(),
+        clients: Optional[ClientRegistry] = None,
+    ):
         """
         Logs class init.
 
@@ -12,15 +708,33 @@ class Logs:
         ----------
         session : boto3.Session
             The authenticated session to be used for CloudWatch Logs operations.
+        client_kwargs : dict, optional
+            Additional parameters passed to the boto3 client, by default {}.
+        clients : ClientRegistry, optional
+            Registry used to share clients, by default a new one for the session.
         """
         self.session = session
-        self.client = self.session.client(service_name="logs")
+        self.client_kwargs = client_kwargs
+        self.clients = clients if clients is not None else ClientRegistry(session)
 
-    def execute_query(
-        self, log_group_names, query_string, start_time, end_time, **kwargs
-    ):
+    @property
+    def client(self):
+        """Shared CloudWatch Logs client, created on first use."""
+        return self.clients.client("logs", **self.client_kwargs)
+
+    def start_query(
+        self,
+        log_group_names,
+        query_string,
+        start_time,
+        end_time,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 10.0,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Query:
         """
-        Execute a query to retrieve logs and get the query results.
+        Start a query without waiting for it.
 
         Parameters
         ----------
@@ -36,13 +750,23 @@ class Logs:
         end_time : int
             The end time of the logs to query (in milliseconds).
 
+        poll_interval : float, optional
+            First polling delay, in seconds, by default 0.5.
+
+        max_poll_interval : float, optional
+            Largest polling delay, in seconds, by default 10.
+
+        timeout : float, optional
+            Maximum query duration, in seconds, before it is stopped,
+            by default None (no limit).
+
         kwargs : dict, optional
             Additional optional parameters to be passed to the `start_query` method.
 
         Returns
         -------
-        dict
-            The response containing the query results.
+        Query
+            Handle to the running query. Call `result()` to wait for it.
         """
         response = self.client.start_query(
             logGroupNames=log_group_names,
@@ -51,16 +775,573 @@ class Logs:
             endTime=end_time,
             **kwargs,
         )
-        query_id = response["queryId"]
+        return Query(
+            self.client,
+            response["queryId"],
+            poll_interval,
+            max_poll_interval,
+            timeout,
+        )
 
-        while True:
-            response = self.client.get_query_results(queryId=query_id)
-            status_response = response["status"]
-            if status_response == "Complete":
-                break
-            elif status_response == "Failed" or status_response == "Cancelled":
-                raise Exception(
-                    f"Query execution failed or was cancelled. Status: {status_response}"
-                )
+    def execute_query(
+        self,
+        log_group_names,
+        query_string,
+        start_time,
+        end_time,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ):
+        """
+        Execute a query to retrieve logs and get the query results.
+
+        Parameters
+        ----------
+        log_group_names : list
+            The list of log group names to query.
+
+        query_string : str
+            The query string to search logs.
+
+        start_time : int
+            The start time of the logs to query (in milliseconds).
+
+        end_time : int
+            The end time of the logs to query (in milliseconds).
+
+        timeout : float, optional
+            Maximum wait, in seconds, before the query is stopped,
+            by default None (wait forever).
+
+        kwargs : dict, optional
+            Additional optional parameters to be passed to `start_query`.
+
+        Returns
+        -------
+        dict
+            The response containing the query results.
+        """
+        query = self.start_query(
+            log_group_names,
+            query_string,
+            start_time,
+            end_time,
+            timeout=timeout,
+            **kwargs,
+        )
+        return query.result()
+
+    def execute_queries(
+        self,
+        queries: Iterable[Dict[str, Any]],
+        max_concurrent: int = MAX_CONCURRENT_QUERIES,
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Run many queries, keeping at most `max_concurrent` of them running.
+
+        Queries are polled together from the calling thread, each with its own
+        backoff, and new ones start as others finish.
+
+        Parameters
+        ----------
+        queries : Iterable[Dict[str, Any]]
+            `start_query` keyword arguments of each query (log_group_names,
+            query_string, start_time, end_time, ...).
+        max_concurrent : int, optional
+            Maximum number of running queries, by default 30 (the service quota).
+        timeout : float, optional
+            Maximum wait for each query, in seconds, counted from its start,
+            by default None (wait forever).
+        return_exceptions : bool, optional
+            Return errors in place of the failed query results instead of
+            raising the first one, by default False.
+
+        Returns
+        -------
+        List[Any]
+            get_query_results responses (or errors), in the order of `queries`.
+        """
+        pending = list(enumerate(queries))[::-1]
+        results: List[Any] = [None] * len(pending)
+        running: Dict[int, Query] = dict()
+
+        try:
+            while pending or running:
+                while pending and len(running) < max_concurrent:
+                    index, query_kwargs = pending.pop()
+                    running[index] = self.start_query(timeout=timeout, **query_kwargs)
+
+                _collect_finished(running, results, return_exceptions)
+
+                if running:
+                    next_check = min(query.next_check for query in running.values())
+                    time.sleep(max(0.0, next_check - time.monotonic()))
+        except BaseException:
+            for query in running.values():
+                query.cancel()
+            raise
+
+        return results
+
+    def execute_sharded_query(
+        self,
+        log_group_names,
+        query_string,
+        start_time,
+        end_time,
+        shards: int = 8,
+        max_concurrent: int = MAX_CONCURRENT_QUERIES,
+        max_rows: int = MAX_QUERY_ROWS,
+        min_shard: int = 1,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> Iterator[Any]:
+        """
+        Execute a query over a long time range, split into concurrent shards.
+
+        The range is split into `shards` equal time windows, queried concurrently.
+        A window returning `max_rows` rows (the results were probably truncated)
+        is split in two and queried again. Rows are yielded shard by shard, in
+        chronological order, as soon as the leading shards complete. For globally
+        ordered rows, sort the query by ascending `@timestamp`, and add
+        `| limit 10000` to get more than the default 1000 rows per shard.
+
+        Parameters
+        ----------
+        log_group_names : list
+            The list of log group names to query.
+
+        query_string : str
+            The query string to search logs.
+
+        start_time : int
+            The start time of the logs to query.
+
+        end_time : int
+            The end time of the logs to query, in the same unit as `start_time`.
+
+        shards : int, optional
+            Initial number of time windows, by default 8.
+
+        max_concurrent : int, optional
+            Maximum number of running queries, by default 30.
+
+        max_rows : int, optional
+            Row count meaning a window was truncated, by default 10000. Use the
+            query `limit` (1000 when absent) if lower.
+
+        min_shard : int, optional
+            Windows shorter than this are never split, by default 1.
+
+        timeout : float, optional
+            Maximum duration of each shard query, in seconds, by default None.
+
+        kwargs : dict, optional
+            Additional optional parameters to be passed to `start_query`.
+
+        Yields
+        ------
+        list
+            Result rows, as in get_query_results 'results'.
+        """
+        step = max(1, math.ceil((end_time - start_time + 1) / shards))
+        windows = [
+            _Shard(start, min(start + step - 1, end_time))
+            for start in range(start_time, end_time + 1, step)
+        ]
+
+        def start_query(start: int, end: int) -> Query:
+            return self.start_query(
+                log_group_names, query_string, start, end, timeout=timeout, **kwargs
+            )
+
+        yield from _ShardedQuery(
+            start_query, windows, max_concurrent, max_rows, min_shard
+        )
+
+    def filter_events(
+        self,
+        log_group_names: List[str],
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        filter_pattern: Optional[str] = None,
+        checkpoint: Optional[Union[str, Path, ExportCheckpoint]] = None,
+        max_workers: int = 1,
+        **kwargs,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over raw log events of several log groups, fetching pages lazily.
+
+        Parameters
+        ----------
+        log_group_names : List[str]
+            Log groups to read.
+        start_time : Optional[int], optional
+            Start of the events to read (in milliseconds), by default None.
+        end_time : Optional[int], optional
+            End of the events to read (in milliseconds), by default None.
+        filter_pattern : Optional[str], optional
+            CloudWatch Logs filter pattern, by default None (every event).
+        checkpoint : Optional[Union[str, Path, ExportCheckpoint]], optional
+            Resume tokens file. Log groups already exported are skipped and
+            the others resume from their last page, by default None.
+        max_workers : int, optional
+            Number of log groups read at the same time. Events of different
+            groups are interleaved when above 1, by default 1.
+        kwargs : dict, optional
+            Additional parameters passed to `filter_log_events`
+            (e.g. logStreamNames).
+
+        Yields
+        ------
+        Dict[str, Any]
+            Log events, with their 'logGroupName'.
+        """
+        if start_time is not None:
+            kwargs["startTime"] = start_time
+        if end_time is not None:
+            kwargs["endTime"] = end_time
+        if filter_pattern is not None:
+            kwargs["filterPattern"] = filter_pattern
+        tokens = _checkpoint(checkpoint)
+
+        readers = (
+            self._filter_group(group, tokens, **kwargs) for group in log_group_names
+        )
+        yield from _staged(_chain(readers, max_workers), tokens)
+
+    def _filter_group(
+        self, group: str, tokens: Optional[ExportCheckpoint], **kwargs
+    ) -> Iterator[Any]:
+        """Paginate filter_log_events over a log group, marking resume tokens."""
+        token = tokens.get(group) if tokens else None
+        while token != ExportCheckpoint.DONE:
+            if token:
+                kwargs["nextToken"] = token
+            response = self.client.filter_log_events(logGroupName=group, **kwargs)
+            for event in response.get("events", []):
+                event["logGroupName"] = group
+                yield event
+
+            token = response.get("nextToken") or ExportCheckpoint.DONE
+            if tokens:
+                yield _PageEnd(group, token)
+
+    def stream_events(
+        self,
+        log_group_name: str,
+        log_stream_names: List[str],
+        start_time: Optional[int] = None,
+        end_time: Optional[int] = None,
+        checkpoint: Optional[Union[str, Path, ExportCheckpoint]] = None,
+        max_workers: int = 1,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the events of log streams, oldest first, fetching pages lazily.
+
+        Parameters
+        ----------
+        log_group_name : str
+            Log group of the streams.
+        log_stream_names : List[str]
+            Log streams to read.
+        start_time : Optional[int], optional
+            Start of the events to read (in milliseconds), by default None.
+        end_time : Optional[int], optional
+            End of the events to read (in milliseconds), by default None.
+        checkpoint : Optional[Union[str, Path, ExportCheckpoint]], optional
+            Resume tokens file, by default None.
+        max_workers : int, optional
+            Number of streams read at the same time. Events of different
+            streams are interleaved when above 1, by default 1.
+
+        Yields
+        ------
+        Dict[str, Any]
+            Log events, with their 'logGroupName' and 'logStreamName'.
+        """
+        kwargs: Dict[str, Any] = {"logGroupName": log_group_name, "startFromHead": True}
+        if start_time is not None:
+            kwargs["startTime"] = start_time
+        if end_time is not None:
+            kwargs["endTime"] = end_time
+        tokens = _checkpoint(checkpoint)
+
+        readers = (
+            self._read_stream(stream, tokens, **kwargs) for stream in log_stream_names
+        )
+        yield from _staged(_chain(readers, max_workers), tokens)
+
+    def _read_stream(
+        self, stream: str, tokens: Optional[ExportCheckpoint], **kwargs
+    ) -> Iterator[Any]:
+        """Paginate get_log_events forward over a stream, marking resume tokens."""
+        key = f"{kwargs['logGroupName']}/{stream}"
+        token = tokens.get(key) if tokens else None
+
+        while token != ExportCheckpoint.DONE:
+            if token:
+                kwargs["nextToken"] = token
+            response = self.client.get_log_events(logStreamName=stream, **kwargs)
+            for event in response.get("events", []):
+                event["logGroupName"] = kwargs["logGroupName"]
+                event["logStreamName"] = stream
+                yield event
+
+            # Pages may be empty before the end: the stream only ends when the
+            # returned token is the one that was sent.
+            next_token = response.get("nextForwardToken")
+            if not next_token or next_token == token:
+                token = ExportCheckpoint.DONE
+            else:
+                token = next_token
+            if tokens:
+                yield _PageEnd(key, token)
+
+    def export_events(
+        self,
+        events: Iterable[Dict[str, Any]],
+        target: Union[str, Path],
+        compress: bool = True,
+        append: bool = False,
+        checkpoint: Optional[ExportCheckpoint] = None,
+    ) -> int:
+        """
+        Write log events to a (gzip'd) NDJSON file, in constant memory.
+
+        Pass the `ExportCheckpoint` given to `filter_events` or `stream_events`
+        to save resume tokens only once the events they cover are on disk: each
+        page is then written as its own gzip member, flushed and fsynced before
+        the tokens and the file size are saved. When resuming with `append`,
+        the file is first truncated to that size, dropping any partial write.
+
+        Parameters
+        ----------
+        events : Iterable[Dict[str, Any]]
+            Events, e.g. from `filter_events` or `stream_events`.
+        target : Union[str, Path]
+            Output file path.
+        compress : bool, optional
+            Gzip the output, by default True.
+        append : bool, optional
+            Append to an existing file, e.g. when resuming from a checkpoint,
+            by default False.
+        checkpoint : Optional[ExportCheckpoint], optional
+            Checkpoint of the events reader, by default None.
+
+        Returns
+        -------
+        int
+            Number of written events.
+        """
+        if checkpoint is not None:
+            checkpoint.autocommit = False
+        count = 0
+
+        with open(target, "ab" if append else "wb") as file:
+            if append and checkpoint is not None and checkpoint.offset is not None:
+                file.truncate(checkpoint.offset)
+            output = _ExportFile(file, compress)
+
+            for event in events:
+                if checkpoint is not None and checkpoint.pending:
+                    checkpoint.commit(offset=output.sync())
+                output.write(json.dumps(event, separators=(",", ":")) + "\n")
+                count += 1
+
+            offset = output.sync()
+            if checkpoint is not None:
+                checkpoint.commit(offset=offset)
+
+        return count
+
+    def writer(
+        self,
+        log_group_name: str,
+        log_stream_name: str,
+        create: bool = True,
+        **kwargs,
+    ) -> LogWriter:
+        """
+        Get a buffered writer shipping events to a log stream.
+
+        Parameters
+        ----------
+        log_group_name : str
+            Target log group.
+        log_stream_name : str
+            Target log stream.
+        create : bool, optional
+            Create the log group and stream if missing, by default True.
+        kwargs : dict, optional
+            Additional parameters passed to `LogWriter`.
+
+        Returns
+        -------
+        LogWriter
+            Running writer. Close it (or use it as a context manager) to ship
+            remaining events.
+        """
+        if create:
+            for create_call, params in (
+                (self.client.create_log_group, dict()),
+                (self.client.create_log_stream, dict(logStreamName=log_stream_name)),
+            ):
+                try:
+                    create_call(logGroupName=log_group_name, **params)
+                except ClientError as error:
+                    code = error.response.get("Error", {}).get("Code")
+                    if code != "ResourceAlreadyExistsException":
+                        raise
+
+        return LogWriter(self.client, log_group_name, log_stream_name, **kwargs)
+
+
+class _ExportFile:
+    """NDJSON output file, written as a series of gzip members when compressed."""
+
+    def __init__(self, file, compress: bool):
+        self.file = file
+        self.compress = compress
+        self.member: Optional[gzip.GzipFile] = None
+
+    def write(self, line: str):
+        """Write a line, starting a new gzip member if needed."""
+        if self.compress and self.member is None:
+            self.member = gzip.GzipFile(fileobj=self.file, mode="wb")
+        (self.member or self.file).write(line.encode("utf-8"))
+
+    def sync(self) -> int:
+        """Close the current gzip member and flush to disk. Return the file size."""
+        if self.member is not None:
+            self.member.close()
+            self.member = None
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return os.fstat(self.file.fileno()).st_size
+
+
+def _chain(readers: Iterable[Iterable[Any]], max_workers: int) -> Iterator[Any]:
+    """Consume readers one after the other, or interleaved on worker threads."""
+    if max_workers > 1:
+        yield from interleave(readers, max_workers)
+        return
+    for reader in readers:
+        yield from reader
+
+
+def _checkpoint(
+    checkpoint: Optional[Union[str, Path, ExportCheckpoint]],
+) -> Optional[ExportCheckpoint]:
+    """Build an ExportCheckpoint from a path, if needed."""
+    if checkpoint is None or isinstance(checkpoint, ExportCheckpoint):
+        return checkpoint
+    return ExportCheckpoint(checkpoint)
+
+
+def _convert(values: List[Optional[str]], parse: Callable[[str], Any]) -> List[Any]:
+    """Parse every non null value of a column, raising on the first failure."""
+    return [None if value is None else parse(value) for value in values]
+
+
+def _timestamp(value: str) -> datetime:
+    """Parse a Logs Insights timestamp ('2023-07-01 12:00:00.000', UTC)."""
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def _infer(values: List[Optional[str]]) -> List[Any]:
+    """Convert a column of strings to ints, floats or timestamps, if they all fit."""
+    for parse in (int, float, _timestamp):
+        try:
+            return _convert(values, parse)
+        except (TypeError, ValueError):
+            continue
+    return values
+
+
+def results_to_columns(
+    results: Union[Dict[str, Any], List[List[Dict[str, str]]]],
+    infer_types: bool = True,
+    drop_ptr: bool = True,
+) -> Dict[str, List[Any]]:
+    """
+    Convert Logs Insights results to columns (a dict of lists).
+
+    Parameters
+    ----------
+    results : Union[Dict[str, Any], List[List[Dict[str, str]]]]
+        A get_query_results response (or its 'results' rows).
+    infer_types : bool, optional
+        Convert columns whose values are all integers, numbers or timestamps,
+        by default True. Other columns are kept as strings.
+    drop_ptr : bool, optional
+        Drop the '@ptr' column, by default True.
+
+    Returns
+    -------
+    Dict[str, List[Any]]
+        Columns by field name, in order of first appearance. Missing values
+        are None.
+    """
+    rows = results["results"] if isinstance(results, dict) else results
+    columns: Dict[str, List[Any]] = dict()
+
+    for index, row in enumerate(rows):
+        for cell in row:
+            column = columns.get(cell["field"])
+            if column is None:
+                column = columns[cell["field"]] = [None] * len(rows)
+            column[index] = cell.get("value")
+
+    if drop_ptr:
+        columns.pop("@ptr", None)
+
+    if infer_types:
+        columns = {name: _infer(values) for name, values in columns.items()}
+
+    return columns
+
+
+def results_to_dataframe(
+    results: Union[Dict[str, Any], List[List[Dict[str, str]]]],
+    backend: str = "pandas",
+    drop_ptr: bool = True,
+) -> Any:
+    """
+    Convert Logs Insights results to a pandas DataFrame or a pyarrow Table.
+
+    Requires the optional `pandas` or `pyarrow` package. With pandas, numbers
+    and timestamps are converted column-wise with its vectorized parsers.
+
+    Parameters
+    ----------
+    results : Union[Dict[str, Any], List[List[Dict[str, str]]]]
+        A get_query_results response (or its 'results' rows).
+    backend : str, optional
+        'pandas' or 'pyarrow', by default 'pandas'.
+    drop_ptr : bool, optional
+        Drop the '@ptr' column, by default True.
+
+    Returns
+    -------
+    pandas.DataFrame or pyarrow.Table
+        The results table.
+    """
+    if backend == "pyarrow":
+        return to_frame(results_to_columns(results, True, drop_ptr), backend)
+
+    frame = to_frame(results_to_columns(results, False, drop_ptr), backend)
+    import pandas
+
+    for name in frame.columns:
+        numbers = pandas.to_numeric(frame[name], errors="coerce")
+        if numbers.notna().sum() == frame[name].notna().sum():
+            frame[name] = numbers
+            continue
+        dates = pandas.to_datetime(frame[name], errors="coerce", utc=True)
+        if dates.notna().sum() == frame[name].notna().sum():
+            frame[name] = dates
 
-        return response
+    return frame
@@ -0,0 +1,265 @@
+"""Botree client instrumentation."""
+
+import logging
+import threading
+import time
+
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""Upper bounds of the latency histogram buckets, in seconds."""
+
+THROTTLING_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "ProvisionedThroughputExceededException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "SlowDown",
+    "LimitExceededException",
+}
+"""Error codes counted as throttles."""
+
+_PREFIX = "botree_metrics_"
+
+
+@dataclass
+class CallRecord:
+    """Measures of a single API call (or of a custom timed operation)."""
+
+    service: str
+    operation: str
+    seconds: float
+    status: Optional[int] = None
+    error: Optional[str] = None
+    retries: int = 0
+    throttles: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+
+
+@dataclass
+class OperationStats:
+    """Aggregated measures of an operation."""
+
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    throttles: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def add(self, record: CallRecord):
+        """Add a call to the totals and to the latency histogram."""
+        self.calls += 1
+        self.errors += record.error is not None
+        self.retries += record.retries
+        self.throttles += record.throttles
+        self.bytes_sent += record.bytes_sent
+        self.bytes_received += record.bytes_received
+        self.seconds += record.seconds
+        self.max_seconds = max(self.max_seconds, record.seconds)
+
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if record.seconds <= bound:
+                self.buckets[index] += 1
+                return
+        self.buckets[-1] += 1
+
+
+class LoggingSink:
+    """Sink logging every call record."""
+
+    def __init__(
+        self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG
+    ):
+        """
+        Logging sink init.
+
+        Parameters
+        ----------
+        logger : logging.Logger, optional
+            Target logger, by default the `botree.metrics` logger.
+        level : int, optional
+            Level of the records, by default logging.DEBUG.
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def __call__(self, record: CallRecord):
+        """Log a call record."""
+        self.logger.log(
+            self.level,
+            "%s.%s %.1f ms status=%s error=%s retries=%d throttles=%d sent=%d received=%d",
+            record.service,
+            record.operation,
+            record.seconds * 1000,
+            record.status,
+            record.error,
+            record.retries,
+            record.throttles,
+            record.bytes_sent,
+            record.bytes_received,
+        )
+
+
+class Metrics:
+    """
+    Per-operation call counts, latency histograms, retries, throttles and bytes.
+
+    Measures come from botocore's event system: `attach` registers handlers on
+    a client, so clients that were never attached pay nothing. Every call is
+    aggregated in memory (see `snapshot`) and passed to the sinks, callables
+    receiving a `CallRecord` (e.g. `LoggingSink`, or a function feeding a
+    StatsD or Prometheus client). Use `Session.instrument` to attach every
+    client of a session.
+    """
+
+    def __init__(self, *sinks: Callable[[CallRecord], Any]):
+        """
+        Metrics init.
+
+        Parameters
+        ----------
+        sinks : Callable[[CallRecord], Any], optional
+            Functions called with the record of every call.
+        """
+        self.sinks = list(sinks)
+        self._stats: Dict[Tuple[str, str], OperationStats] = dict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def attach(self, client):
+        """
+        Record the calls of a botocore client.
+
+        Parameters
+        ----------
+        client : botocore.client.BaseClient
+            Instrumented client.
+        """
+        events = client.meta.events
+        for event, handler in (
+            ("before-call", self._before_call),
+            ("before-send", self._before_send),
+            ("needs-retry", self._needs_retry),
+            ("after-call", self._after_call),
+            ("after-call-error", self._after_call_error),
+        ):
+            events.register(event, handler, unique_id=f"{_PREFIX}{id(self)}_{event}")
+
+    def observe(self, service: str, operation: str, seconds: float, **kwargs):
+        """Record a custom timed operation, e.g. client creation."""
+        self.record(CallRecord(service, operation, seconds, **kwargs))
+
+    def record(self, record: CallRecord):
+        """Aggregate a call record and pass it to the sinks."""
+        with self._lock:
+            key = (record.service, record.operation)
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = OperationStats()
+            stats.add(record)
+
+        for sink in self.sinks:
+            try:
+                sink(record)
+            except Exception:
+                logging.getLogger(__name__).exception("Metrics sink failed.")
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Copy of the aggregated measures.
+
+        Returns
+        -------
+        Dict[str, Dict[str, Dict[str, Any]]]
+            `OperationStats` fields by service and operation. `buckets` counts
+            calls by latency, with upper bounds in `LATENCY_BUCKETS` (plus a
+            last, unbounded bucket).
+        """
+        snapshot: Dict[str, Dict[str, Dict[str, Any]]] = dict()
+        with self._lock:
+            for (service, operation), stats in self._stats.items():
+                snapshot.setdefault(service, dict())[operation] = asdict(stats)
+        return snapshot
+
+    def reset(self):
+        """Drop the aggregated measures."""
+        with self._lock:
+            self._stats.clear()
+
+    def _before_call(self, model, context, **kwargs):
+        """Start timing a call."""
+        context[_PREFIX + "call"] = {
+            "service": model.service_model.service_name,
+            "operation": model.name,
+            "start": time.perf_counter(),
+            "attempts": 0,
+            "throttles": 0,
+            "bytes_sent": 0,
+        }
+        self._local.call = context[_PREFIX + "call"]
+
+    def _before_send(self, request, **kwargs):
+        """Count the bytes of every attempt of the current call."""
+        call = getattr(self._local, "call", None)
+        if call is not None:
+            call["bytes_sent"] += int(request.headers.get("Content-Length") or 0)
+
+    def _needs_retry(self, request_dict, response=None, **kwargs):
+        """Count attempts and throttled responses."""
+        call = request_dict.get("context", {}).get(_PREFIX + "call")
+        if call is None:
+            return
+        call["attempts"] += 1
+        if response is not None:
+            http, parsed = response
+            code = parsed.get("Error", {}).get("Code")
+            call["throttles"] += code in THROTTLING_CODES or http.status_code == 429
+
+    def _finish(self, context, **kwargs):
+        """Record a finished call."""
+        call = context.pop(_PREFIX + "call", None)
+        self._local.call = None
+        if call is None:
+            return
+        self.observe(
+            call["service"],
+            call["operation"],
+            time.perf_counter() - call["start"],
+            retries=max(0, call["attempts"] - 1),
+            throttles=call["throttles"],
+            bytes_sent=call["bytes_sent"],
+            **kwargs,
+        )
+
+    def _after_call(self, http_response, parsed, context, **kwargs):
+        """Record a call that got a response, successful or not."""
+        error = parsed.get("Error", {}).get("Code")
+        received = http_response.headers.get("content-length") or 0
+        self._finish(
+            context,
+            status=http_response.status_code,
+            error=error if http_response.status_code >= 300 else None,
+            bytes_received=int(received),
+        )
+
+    def _after_call_error(self, exception, context, **kwargs):
+        """Record a call that failed without a response (e.g. a timeout)."""
+        self._finish(context, error=type(exception).__name__)
@@ -0,0 +1,273 @@
+"""Botree client-side rate limiting."""
+
+import threading
+import time
+
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from botree.metrics import THROTTLING_CODES
+
+
+S3_READ_RATE = 5500.0
+"""S3 GET/HEAD requests per second and prefix."""
+
+S3_WRITE_RATE = 3500.0
+"""S3 PUT/COPY/POST/DELETE requests per second and prefix."""
+
+MAX_PREFIXES = 10000
+"""Maximum number of S3 prefixes tracked at once (oldest are dropped)."""
+
+_KEY = "botree_rate_limits"
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket whose rate adapts AIMD-style.
+
+    Each successful request raises the rate so that it grows by `increase`
+    requests per second, every second, up to `max_rate`. A throttled request
+    multiplies it by `decrease` (at most once per `cooldown`, so a burst of
+    throttled concurrent requests counts once), down to `min_rate`.
+    """
+
+    def __init__(
+        self,
+        max_rate: float,
+        rate: Optional[float] = None,
+        min_rate: float = 1.0,
+        increase: Optional[float] = None,
+        decrease: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        """
+        Token bucket init.
+
+        Parameters
+        ----------
+        max_rate : float
+            Rate ceiling, in requests per second.
+        rate : float, optional
+            Initial rate, by default `max_rate`.
+        min_rate : float, optional
+            Rate floor, by default 1.
+        increase : float, optional
+            Additive increase, in requests per second per second,
+            by default 5% of `max_rate`.
+        decrease : float, optional
+            Multiplicative decrease factor, by default 0.5.
+        cooldown : float, optional
+            Minimum time between two decreases, in seconds, by default 1.
+        """
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        self.rate = min(max_rate, rate or max_rate)
+        self.increase = increase if increase is not None else max_rate / 20
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self.throttles = 0
+
+        self._tokens = max(1.0, self.rate)
+        self._updated = time.monotonic()
+        self._decreased = float("-inf")
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take a token, sleeping until it is available.
+
+        Tokens are reserved in order, so waiting callers are served fairly.
+
+        Returns
+        -------
+        float
+            Time waited, in seconds.
+        """
+        with self._lock:
+            now = time.monotonic()
+            capacity = max(1.0, self.rate)
+            self._tokens = min(
+                capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def success(self):
+        """Additively increase the rate after a successful request."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def throttled(self):
+        """Multiplicatively decrease the rate after a throttled request."""
+        with self._lock:
+            self.throttles += 1
+            now = time.monotonic()
+            if now - self._decreased < self.cooldown:
+                return
+            self._decreased = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+
+
+class RateLimits:
+    """
+    Client-side rate limits, by service and by S3 prefix.
+
+    Limits are enforced through botocore's event system: every attempt
+    (retries included) of an attached client takes a token from the buckets of
+    its service (and, for S3, of its bucket prefix), and their rates adapt to
+    throttling responses. Use `Session.rate_limit` and
+    `Session.rate_limit_s3_prefixes`, which share one instance with every
+    client of the session.
+    """
+
+    def __init__(self) -> None:
+        """Rate limits init, without any limit."""
+        self.services: Dict[str, TokenBucket] = dict()
+        self.prefixes: Dict[Tuple[str, str, bool], TokenBucket] = dict()
+        self.prefix_rates: Optional[Tuple[float, float]] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def limit(self, service_name: str, max_rate: float, **kwargs) -> TokenBucket:
+        """
+        Limit the request rate of a service.
+
+        Parameters
+        ----------
+        service_name : str
+            AWS service name, e.g. 'secretsmanager'.
+        max_rate : float
+            Rate ceiling, in requests per second.
+        kwargs : dict, optional
+            Additional parameters passed to `TokenBucket`.
+
+        Returns
+        -------
+        TokenBucket
+            The service bucket, replacing any previous one.
+        """
+        bucket = TokenBucket(max_rate, **kwargs)
+        with self._lock:
+            self.services[service_name] = bucket
+        return bucket
+
+    def setdefault(self, service_name: str, max_rate: float, **kwargs) -> TokenBucket:
+        """
+        Limit the request rate of a service, unless it is already limited.
+
+        Parameters
+        ----------
+        service_name : str
+            AWS service name, e.g. 'ce'.
+        max_rate : float
+            Rate ceiling, in requests per second, of a new bucket.
+        kwargs : dict, optional
+            Additional parameters passed to `TokenBucket`.
+
+        Returns
+        -------
+        TokenBucket
+            The existing service bucket, or a new one.
+        """
+        with self._lock:
+            bucket = self.services.get(service_name)
+            if bucket is None:
+                bucket = self.services[service_name] = TokenBucket(max_rate, **kwargs)
+        return bucket
+
+    def limit_s3_prefixes(
+        self, read_rate: float = S3_READ_RATE, write_rate: float = S3_WRITE_RATE
+    ):
+        """
+        Limit S3 requests per bucket prefix (the key up to its last '/').
+
+        Parameters
+        ----------
+        read_rate : float, optional
+            GET/HEAD ceiling per prefix, by default 5500.
+        write_rate : float, optional
+            PUT/COPY/POST/DELETE ceiling per prefix, by default 3500.
+        """
+        with self._lock:
+            self.prefix_rates = (read_rate, write_rate)
+            self.prefixes.clear()
+
+    def _prefix(self, bucket: str, key: str, read: bool) -> TokenBucket:
+        """Get (or create) the token bucket of an S3 prefix."""
+        prefix = (bucket, key.rpartition("/")[0], read)
+        with self._lock:
+            token_bucket = self.prefixes.get(prefix)
+            if token_bucket is None:
+                if len(self.prefixes) >= MAX_PREFIXES:
+                    del self.prefixes[next(iter(self.prefixes))]
+                read_rate, write_rate = self.prefix_rates  # type: ignore
+                token_bucket = TokenBucket(read_rate if read else write_rate)
+                self.prefixes[prefix] = token_bucket
+        return token_bucket
+
+    def buckets(self, model, params: Dict[str, Any]) -> List[TokenBucket]:
+        """Token buckets a call must go through."""
+        service_name = model.service_model.service_name
+        buckets = list()
+
+        service = self.services.get(service_name)
+        if service is not None:
+            buckets.append(service)
+
+        if service_name == "s3" and self.prefix_rates and "Bucket" in params:
+            read = model.http.get("method") in ("GET", "HEAD")
+            buckets.append(self._prefix(params["Bucket"], params.get("Key", ""), read))
+
+        return buckets
+
+    def attach(self, client):
+        """
+        Enforce the limits on a botocore client.
+
+        Parameters
+        ----------
+        client : botocore.client.BaseClient
+            Limited client.
+        """
+        events = client.meta.events
+        for event, handler in (
+            ("before-parameter-build", self._before_parameter_build),
+            ("before-send", self._before_send),
+            ("needs-retry", self._needs_retry),
+        ):
+            events.register(event, handler, unique_id=f"{_KEY}_{id(self)}_{event}")
+
+    def _before_parameter_build(self, params, model, context, **kwargs):
+        """Select the token buckets of a call."""
+        buckets = self.buckets(model, params)
+        context[_KEY] = buckets
+        self._local.buckets = buckets
+
+    def _before_send(self, **kwargs):
+        """Take a token from every bucket of the current call, for each attempt."""
+        for bucket in getattr(self._local, "buckets", ()):
+            bucket.acquire()
+
+    def _needs_retry(self, request_dict, response=None, **kwargs):
+        """Adapt the rates to the response of an attempt."""
+        buckets = request_dict.get("context", {}).get(_KEY)
+        if not buckets or response is None:
+            return
+
+        http, parsed = response
+        code = parsed.get("Error", {}).get("Code")
+        throttled = code in THROTTLING_CODES or http.status_code == 429
+        for bucket in buckets:
+            if throttled:
+                bucket.throttled()
+            elif http.status_code < 500:
+                bucket.success()
@@ -1,11 +1,649 @@
 """Botree S3 utilities."""
 
+import hashlib
+import heapq
+import io
+import json
+import math
+import mmap
+import os
+import shutil
+import threading
+import time
+
+from dataclasses import dataclass
+from dataclasses import field
+from operator import itemgetter
 from pathlib import Path
+from typing import Any
+from typing import Dict
 from typing import Generator
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
+from typing import Union
+from urllib.parse import urlencode
 
 from boto3.session import Session
+from botocore.exceptions import ClientError
+
+from botree.clients import ClientRegistry
+from botree.utils import FileLock
+from botree.utils import bounded_map
+from botree.utils import chunked
+
+
+@dataclass
+class TransferReport:
+    """Outcome of a bulk S3 operation."""
+
+    transferred: Dict[str, int] = field(default_factory=dict)
+    """Successfully processed keys (or paths) and their size in bytes."""
+    failed: Dict[str, BaseException] = field(default_factory=dict)
+    """Keys (or paths) that failed and the raised exception."""
+    skipped: int = 0
+    """Number of keys (or paths) left untouched."""
+    seconds: float = 0.0
+    """Wall clock duration of the operation."""
+
+    @property
+    def bytes(self) -> int:
+        """Total transferred bytes."""
+        return sum(self.transferred.values())
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Aggregate throughput."""
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+DELETE_BATCH_SIZE = 1000
+"""Maximum number of keys accepted by a single DeleteObjects request."""
+
+MIB = 1024 * 1024
+COPY_MULTIPART_THRESHOLD = 256 * MIB
+"""Objects larger than this are copied with multipart upload_part_copy."""
+MAX_PARTS = 10000
+"""Maximum number of parts of a multipart upload."""
+COPIED_HEADERS = (
+    "CacheControl",
+    "ContentDisposition",
+    "ContentEncoding",
+    "ContentLanguage",
+    "ContentType",
+    "Expires",
+    "Metadata",
+    "StorageClass",
+    "ServerSideEncryption",
+    "SSEKMSKeyId",
+    "BucketKeyEnabled",
+    "WebsiteRedirectLocation",
+)
+"""head_object fields kept by multipart copies, as copy_object does."""
+MULTIPART_CHUNKSIZES = [8 * MIB, 5 * MIB, 16 * MIB, 64 * MIB, 100 * MIB]
+"""Usual multipart part sizes (boto3, AWS CLI and console defaults first)."""
+
+
+def file_etag(path: Union[str, Path], chunk_size: Optional[int] = None) -> str:
+    """
+    Compute the S3 ETag a local file would get when uploaded unencrypted.
+
+    Parameters
+    ----------
+    path : Union[str, Path]
+        local file path.
+    chunk_size : Optional[int], optional
+        Multipart part size. If None, the plain MD5 (single part upload)
+        is returned, by default None.
+
+    Returns
+    -------
+    str
+        The hex digest, suffixed by '-<parts>' for multipart uploads.
+    """
+    block = chunk_size or 8 * MIB
+    whole = hashlib.md5()
+    parts = []
+
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(block), b""):
+            if chunk_size:
+                parts.append(hashlib.md5(chunk).digest())
+            else:
+                whole.update(chunk)
+
+    if not chunk_size:
+        return whole.hexdigest()
+
+    return f"{hashlib.md5(b''.join(parts)).hexdigest()}-{len(parts)}"
+
+
+def _etag_chunksizes(etag: str, size: int) -> List[int]:
+    """Guess which part sizes could have produced a (multipart) ETag."""
+    if "-" not in etag:
+        return [0]
+
+    parts = int(etag.rsplit("-", 1)[1])
+    guess = math.ceil(math.ceil(size / parts) / MIB) * MIB
+    candidates = [guess] + [c for c in MULTIPART_CHUNKSIZES if c != guess]
+
+    return [c for c in candidates if c and math.ceil(size / c) == parts]
+
+
+class SyncManifest:
+    """
+    Local cache of file ETags, used by `Bucket.sync`.
+
+    An entry is reused while the file size and modification time are unchanged,
+    so unchanged files are hashed only once across sync runs.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Sync manifest init.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            JSON file where the manifest is stored. Created if missing.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = dict()
+
+        if self.path.is_file():
+            try:
+                self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.entries = dict()
+
+    def etag(self, name: str, path: Path, chunk_size: int = 0) -> str:
+        """
+        Get the (cached) ETag of a local file.
+
+        Parameters
+        ----------
+        name : str
+            Manifest entry name, usually the path relative to the synced folder.
+        path : Path
+            local file path.
+        chunk_size : int, optional
+            Multipart part size, 0 for single part uploads, by default 0.
+
+        Returns
+        -------
+        str
+            The file ETag.
+        """
+        stat = path.stat()
+        with self._lock:
+            entry = self.entries.get(name)
+            if (
+                entry is None
+                or entry["size"] != stat.st_size
+                or entry["mtime_ns"] != stat.st_mtime_ns
+            ):
+                entry = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "etags": {},
+                }
+                self.entries[name] = entry
+            etag = entry["etags"].get(str(chunk_size))
+
+        if etag is None:
+            etag = file_etag(path, chunk_size or None)
+            with self._lock:
+                entry["etags"][str(chunk_size)] = etag
+
+        return etag
+
+    def matches(self, name: str, path: Path, etag: str) -> bool:
+        """Tell if a local file has the given (possibly multipart) S3 ETag."""
+        etag = etag.strip('"')
+        size = path.stat().st_size
+        return any(
+            self.etag(name, path, chunk_size) == etag
+            for chunk_size in _etag_chunksizes(etag, size)
+        )
+
+    def is_synced(
+        self,
+        name: str,
+        path: Path,
+        obj: Optional[dict],
+        direction: str = "upload",
+        check_etag: bool = True,
+    ) -> bool:
+        """
+        Tell if a local file and an S3 object are already in sync.
+
+        Parameters
+        ----------
+        name : str
+            Manifest entry name.
+        path : Path
+            local file path.
+        obj : Optional[dict]
+            Object metadata from list_objects_v2, None if missing.
+        direction : str, optional
+            Sync direction, used to decide which side must be newer when
+            comparing modification times, by default 'upload'.
+        check_etag : bool, optional
+            Compare by ETag instead of modification time, by default True.
+
+        Returns
+        -------
+        bool
+            True if no transfer is needed.
+        """
+        if obj is None or not path.is_file():
+            return False
+        if path.stat().st_size != obj["Size"]:
+            return False
+        if check_etag:
+            return self.matches(name, path, obj["ETag"])
+
+        delta = path.stat().st_mtime - obj["LastModified"].timestamp()
+        return delta <= 0 if direction == "upload" else delta >= 0
+
+    def remember(self, name: str, path: Path, etag: str):
+        """Record a known ETag for a local file (e.g. just downloaded)."""
+        etag = etag.strip('"')
+        chunk_sizes = _etag_chunksizes(etag, path.stat().st_size)
+        if len(chunk_sizes) != 1:
+            return
+
+        stat = path.stat()
+        with self._lock:
+            self.entries[name] = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "etags": {str(chunk_sizes[0]): etag},
+            }
+
+    def save(self):
+        """Write the manifest to disk atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp = self.path.with_name(self.path.name + ".tmp")
+        with self._lock:
+            temp.write_text(json.dumps(self.entries), encoding="utf-8")
+        os.replace(temp, self.path)
+
+
+def _walk_files(root: Path) -> Iterator[Tuple[str, Path]]:
+    """Lazily yield (relative posix name, path) for every file under root."""
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = Path(directory, name)
+            yield path.relative_to(root).as_posix(), path
+
+
+def _dir_prefix(prefix: str) -> str:
+    """Terminate a non-empty S3 prefix with '/', so it matches whole directories."""
+    if prefix and not prefix.endswith("/"):
+        prefix = prefix + "/"
+    return prefix
+
+
+def _join_key(prefix: str, name: str) -> str:
+    """Join an S3 prefix and a relative key."""
+    return _dir_prefix(prefix) + name
+
+
+def _local_path(root: Path, name: str) -> Path:
+    """Local path of a relative key, which must resolve under root."""
+    path = root / name
+    if not path.resolve().is_relative_to(root.resolve()):
+        raise ValueError(f"Key resolves outside of {root}: {name}")
+    return path
+
+
+class S3Reader(io.RawIOBase):
+    """
+    Seekable, read-only file-like view of an S3 object.
+
+    Data is fetched with ranged GET requests, pinned to the object ETag, so
+    a concurrent overwrite fails loudly instead of mixing two versions.
+    Usually wrapped in an `io.BufferedReader` by `Bucket.open`, which provides
+    read-ahead buffering.
+    """
+
+    def __init__(self, client, bucket: str, key: str, **kwargs):
+        """
+        S3 reader init.
+
+        Parameters
+        ----------
+        client : botocore.client.BaseClient
+            S3 client.
+        bucket : str
+            Bucket name.
+        key : str
+            Object key.
+        kwargs : dict, optional
+            Additional parameters passed to `get_object` (e.g. VersionId).
+        """
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.kwargs = kwargs
+        head = self.client.head_object(Bucket=bucket, Key=key, **kwargs)
+        self.size: int = head["ContentLength"]
+        self.etag: str = head["ETag"]
+        self._position = 0
+
+    def readable(self) -> bool:
+        """Readers are readable."""
+        return True
+
+    def seekable(self) -> bool:
+        """Readers support random access."""
+        return True
+
+    def tell(self) -> int:
+        """Current position."""
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to a new position, as in `io.IOBase.seek`."""
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        """Read up to len(buffer) bytes with a single ranged GET."""
+        view = memoryview(buffer).cast("B")
+        end = min(self._position + len(view), self.size)
+        if end <= self._position:
+            return 0
+
+        response = self.client.get_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Range=f"bytes={self._position}-{end - 1}",
+            IfMatch=self.etag,
+            **self.kwargs,
+        )
+        data = response["Body"].read()
+        view[: len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def readall(self) -> bytes:
+        """Read up to the end of the object with a single ranged GET."""
+        buffer = bytearray(max(0, self.size - self._position))
+        read = self.readinto(buffer) if buffer else 0
+        return bytes(buffer[:read])
+
+
+class S3Writer(io.RawIOBase):
+    """
+    Write-only file-like object streaming data to S3.
+
+    Written data is buffered in memory up to `part_size` bytes and then sent
+    as a multipart upload part, so memory use stays constant whatever the object
+    size. Small objects (below one part) are sent with a single put_object.
+    The upload is completed on `close()` and aborted if the writer is used as
+    a context manager and an exception is raised.
+    """
+
+    def __init__(
+        self, client, bucket: str, key: str, part_size: int = 8 * MIB, **kwargs
+    ):
+        """
+        S3 writer init.
+
+        Parameters
+        ----------
+        client : botocore.client.BaseClient
+            S3 client.
+        bucket : str
+            Bucket name.
+        key : str
+            Object key.
+        part_size : int, optional
+            Multipart part size in bytes (S3 requires at least 5 MiB),
+            by default 8 MiB.
+        kwargs : dict, optional
+            Additional parameters passed to `put_object` or
+            `create_multipart_upload` (e.g. ContentType).
+        """
+        super().__init__()
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.kwargs = kwargs
+        self._buffer = bytearray()
+        self._parts: List[dict] = []
+        self._upload_id: Optional[str] = None
+
+    def writable(self) -> bool:
+        """Writers are writable."""
+        return True
+
+    def write(self, data) -> int:
+        """Buffer data, uploading full parts as they become available."""
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+
+        self._buffer += data
+        while len(self._buffer) >= self.part_size:
+            self._upload_part(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+
+        return memoryview(data).nbytes
+
+    def _upload_part(self, data):
+        """Send one multipart part, starting the upload if needed."""
+        if self._upload_id is None:
+            upload = self.client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, **self.kwargs
+            )
+            self._upload_id = upload["UploadId"]
+
+        number = len(self._parts) + 1
+        response = self.client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=number,
+            Body=bytes(data),
+        )
+        self._parts.append({"PartNumber": number, "ETag": response["ETag"]})
+
+    def close(self):
+        """Flush the remaining data and complete the upload."""
+        if self.closed:
+            return
+
+        try:
+            if self._upload_id is None:
+                self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    Body=bytes(self._buffer),
+                    **self.kwargs,
+                )
+            else:
+                if self._buffer:
+                    self._upload_part(self._buffer)
+                self.client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={"Parts": self._parts},
+                )
+        except BaseException:
+            self.abort()
+            raise
+        finally:
+            self._buffer = bytearray()
+            super().close()
+
+    def abort(self):
+        """Discard written data, aborting the multipart upload if any."""
+        if self._upload_id is not None:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+            )
+            self._upload_id = None
+        self._buffer = bytearray()
+        super().close()
+
+    def __exit__(self, exc_type, *exc_info):
+        """Complete the upload, or abort it if an exception was raised."""
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+
+class S3TextWriter(io.TextIOWrapper):
+    """Text layer of an `S3Writer`, aborting the upload on exceptions too."""
+
+    def __exit__(self, exc_type, *exc_info):
+        """Complete the upload, or abort it if an exception was raised."""
+        if exc_type is not None:
+            self.buffer.abort()
+        else:
+            self.close()
+
+
+class ObjectCache:
+    """
+    Local read-through disk cache for S3 objects, with LRU eviction.
+
+    Entries are keyed by bucket and key and remember the object ETag. A cached
+    entry is revalidated with a conditional GET (If-None-Match), so unchanged
+    objects cost a request but no transfer. Least recently used entries are
+    evicted once the cache grows above `max_bytes`. Per-entry lock files make
+    concurrent workers on the same host (threads or processes) download each
+    object only once.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int = 10 * 1024 * MIB):
+        """
+        Object cache init.
+
+        Parameters
+        ----------
+        directory : Union[str, Path]
+            Cache directory, may be shared by several processes.
+        max_bytes : int, optional
+            Cache size budget in bytes, by default 10 GiB.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and saved bytes counters of this instance."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bytes_saved": self.bytes_saved,
+        }
+
+    def _entry(self, bucket: str, key: str) -> Path:
+        """Data file path of an entry. Metadata and lock files sit next to it."""
+        digest = hashlib.sha256(f"{bucket}/{key}".encode("utf-8")).hexdigest()
+        return self.directory / digest
+
+    def fetch(
+        self, client, bucket: str, key: str, target: Optional[Path] = None
+    ) -> Path:
+        """
+        Get the local path of an up to date copy of an object.
+
+        Parameters
+        ----------
+        client : botocore.client.BaseClient
+            S3 client.
+        bucket : str
+            Bucket name.
+        key : str
+            Object key.
+        target : Optional[Path], optional
+            Also copy the object there, while the entry is locked (so it can
+            not be evicted meanwhile), by default None.
+
+        Returns
+        -------
+        Path
+            Cached file path. Do not modify it.
+        """
+        data = self._entry(bucket, key)
+        meta = data.with_suffix(".json")
+
+        with FileLock(data.with_suffix(".lock")):
+            kwargs = dict()
+            if data.is_file() and meta.is_file():
+                kwargs["IfNoneMatch"] = json.loads(meta.read_text())["ETag"]
+
+            try:
+                response = client.get_object(Bucket=bucket, Key=key, **kwargs)
+            except ClientError as error:
+                if error.response["Error"]["Code"] not in ("304", "NotModified"):
+                    raise
+                os.utime(data)
+                if target is not None:
+                    shutil.copyfile(data, target)
+                with self._lock:
+                    self.hits += 1
+                    self.bytes_saved += data.stat().st_size
+                return data
+
+            temp = data.with_suffix(".tmp")
+            with open(temp, "wb") as file:
+                for chunk in response["Body"].iter_chunks(MIB):
+                    file.write(chunk)
+            os.replace(temp, data)
+            meta.write_text(
+                json.dumps({"Bucket": bucket, "Key": key, "ETag": response["ETag"]})
+            )
+
+            if target is not None:
+                shutil.copyfile(data, target)
+            with self._lock:
+                self.misses += 1
+
+        self.evict()
+        return data
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits its budget."""
+        entries = []
+        for path in self.directory.iterdir():
+            if not path.suffix and path.is_file():
+                stat = path.stat()
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=itemgetter(0)):
+            if total <= self.max_bytes:
+                break
+            with FileLock(path.with_suffix(".lock")):
+                path.with_suffix(".json").unlink(missing_ok=True)
+                path.unlink(missing_ok=True)
+            total -= size
+
+    def clear(self):
+        """Remove every cached object."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
 
 
 class Bucket:
@@ -17,11 +655,25 @@ class Bucket:
         name: str,
         client_kwargs: dict = dict(),
         resource_kwargs: dict = dict(),
+        clients: Optional[ClientRegistry] = None,
+        cache: Optional[ObjectCache] = None,
     ):
         self.name = name
         self.session = session
-        self.client = self.session.client(service_name="s3", **client_kwargs)
-        self.resource = self.session.resource("s3", **resource_kwargs).Bucket(
+        self.client_kwargs = client_kwargs
+        self.resource_kwargs = resource_kwargs
+        self.clients = clients if clients is not None else ClientRegistry(session)
+        self.cache = cache
+
+    @property
+    def client(self):
+        """Shared S3 client, created on first use."""
+        return self.clients.client("s3", **self.client_kwargs)
+
+    @property
+    def resource(self):
+        """S3 Bucket resource, backed by a shared S3 service resource."""
+        return self.clients.resource("s3", **self.resource_kwargs).Bucket(
             name=self.name
         )
 
@@ -29,6 +681,9 @@ class Bucket:
         """
         Download a file from S3.
 
+        If the bucket has an object cache, the file is copied from the cache,
+        which is refreshed only when the remote object changed.
+
         Parameters
         ----------
         source : Path
@@ -36,7 +691,11 @@ class Bucket:
         target : Path
             local file path.
         """
-        self.resource.download_file(str(source), str(target), **kwargs)
+        if self.cache is not None and not kwargs:
+            self.cache.fetch(self.client, self.name, str(source), target)
+            return
+
+        self.client.download_file(self.name, str(source), str(target), **kwargs)
 
     def upload(self, source: Path, target: Path, **kwargs):
         """
@@ -49,7 +708,7 @@ class Bucket:
         target : Path
             remote file path.
         """
-        self.resource.upload_file(str(source), str(target), **kwargs)
+        self.client.upload_file(str(source), self.name, str(target), **kwargs)
 
     def copy(
         self,
@@ -88,36 +747,61 @@ class Bucket:
         self.client.copy(copy_source, self.name, str(target), **kwargs)  # type: ignore
 
     def list_files(
-        self, prefix: str = "", reverse: bool = False, *args, **kwargs
+        self,
+        prefix: str = "",
+        reverse: bool = False,
+        limit: Optional[int] = None,
+        *args,
+        **kwargs,
     ) -> List[str]:
         """
         List and sort (by date) all files in a given prefix.
 
+        All result pages are read. When `limit` is given, only the oldest (or,
+        with `reverse`, newest) `limit` files are kept while streaming, so memory
+        use does not grow with the number of keys in the prefix.
+
         Parameters
         ----------
         prefix : str
             S3 prefix.
         reverse : bool, optional
             Reverse (descending) date sort, by default False
+        limit : Optional[int], optional
+            Return only the first `limit` files of the sort, by default None.
 
         Returns
         -------
         List[str]
             Paths to files.
         """
-        response = self.client.list_objects_v2(
-            Bucket=self.name, Prefix=prefix, Delimiter="", *args, **kwargs
-        )
+        objects = self._paginate(prefix, **kwargs)
+        by_date = itemgetter("LastModified")
 
-        date_sorted = sorted(
-            response["Contents"],  # type: ignore
-            key=lambda x: x["LastModified"],  # type: ignore
-            reverse=reverse,
-        )
+        if limit is not None:
+            select = heapq.nlargest if reverse else heapq.nsmallest
+            date_sorted = select(limit, objects, key=by_date)
+        else:
+            date_sorted = sorted(objects, key=by_date, reverse=reverse)
+
+        return [obj["Key"] for obj in date_sorted]
 
-        keys = [key["Key"] for key in date_sorted]  # type: ignore
+    def iter_files(self, prefix: str = "", **kwargs) -> Iterator[str]:
+        """
+        Iterate over all files in a given prefix, in key order.
 
-        return keys
+        Parameters
+        ----------
+        prefix : str
+            S3 prefix.
+
+        Yields
+        ------
+        str
+            Paths to files.
+        """
+        for obj in self._paginate(prefix, **kwargs):
+            yield obj["Key"]
 
     def list_folders(self, prefix: str = "", *args, **kwargs) -> List[str]:
         """
@@ -133,16 +817,33 @@ class Bucket:
         List[str]
             Paths to folders.
         """
-        if not prefix.endswith("/"):
+        return list(self.iter_folders(prefix, **kwargs))
+
+    def iter_folders(self, prefix: str = "", **kwargs) -> Iterator[str]:
+        """
+        Iterate over all folders in a given prefix, following pagination.
+
+        Parameters
+        ----------
+        prefix : str
+            S3 prefix.
+
+        Yields
+        ------
+        str
+            Paths to folders.
+        """
+        if prefix and not prefix.endswith("/"):
             prefix = prefix + "/"
 
-        response = self.client.list_objects_v2(
-            Bucket=self.name, Prefix=prefix, Delimiter="/", *args, **kwargs
+        paginator = self.client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=self.name, Prefix=prefix, Delimiter="/", **kwargs
         )
 
-        keys = [key["Prefix"] for key in response["CommonPrefixes"]]  # type: ignore
-
-        return keys
+        for page in pages:
+            for common_prefix in page.get("CommonPrefixes", []):
+                yield common_prefix["Prefix"]
 
     def paginate_objects(self, prefix: str = "", page_size: int = 1000) -> Generator:
         """
@@ -162,6 +863,649 @@ class Bucket:
             files = page.get("Contents")
             yield files
 
+    def iter_objects(self, prefix: str = "", page_size: int = 1000) -> Iterator[dict]:
+        """
+        Iterate over all objects in a given prefix, one object at a time.
+
+        Parameters
+        ----------
+        prefix : str
+            S3 prefix.
+        page_size : int, optional
+            Number of keys requested per page, by default 1000.
+
+        Yields
+        ------
+        dict
+            Object metadata, as returned by list_objects_v2 ('Key', 'Size', ...).
+        """
+        for page in self.paginate_objects(prefix, page_size=page_size):
+            yield from page or []
+
+    def _paginate(self, prefix: str, **kwargs) -> Iterator[dict]:
+        """Iterate over objects, passing extra list_objects_v2 parameters."""
+        if not kwargs:
+            yield from self.iter_objects(prefix)
+            return
+
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.name, Prefix=prefix, **kwargs):
+            yield from page.get("Contents", [])
+
+    def open(
+        self,
+        key: Union[str, Path],
+        mode: str = "rb",
+        part_size: int = 8 * MIB,
+        encoding: Optional[str] = None,
+        **kwargs,
+    ):
+        """
+        Open an object as a file-like stream, without local temporary files.
+
+        Reads use ranged GET requests with `part_size` read-ahead buffering.
+        Writes stream a multipart upload holding at most one part in memory;
+        the object is created when the file is closed, and nothing is created
+        if an exception leaves the `with` block, in binary and text modes.
+
+        Parameters
+        ----------
+        key : Union[str, Path]
+            remote file path.
+        mode : str, optional
+            One of 'rb', 'wb', 'r' or 'w' (text modes), by default 'rb'.
+        part_size : int, optional
+            Read-ahead buffer size, or multipart part size when writing (at least
+            5 MiB), by default 8 MiB.
+        encoding : Optional[str], optional
+            Text encoding for text modes, by default the locale encoding.
+        kwargs : dict, optional
+            Additional parameters passed to `get_object` (reads) or to
+            `put_object` / `create_multipart_upload` (writes).
+
+        Returns
+        -------
+        IO
+            A binary or text file-like object.
+        """
+        if mode not in ("rb", "wb", "r", "w"):
+            raise ValueError(f"Invalid mode: {mode}")
+
+        stream: io.IOBase
+        if mode.startswith("r"):
+            reader = S3Reader(self.client, self.name, str(key), **kwargs)
+            stream = io.BufferedReader(reader, buffer_size=part_size)
+        else:
+            stream = S3Writer(self.client, self.name, str(key), part_size, **kwargs)
+
+        if "b" in mode:
+            return stream
+        if mode == "w":
+            return S3TextWriter(stream, encoding=encoding)  # type: ignore
+
+        return io.TextIOWrapper(stream, encoding=encoding)  # type: ignore
+
+    def download_parallel(
+        self,
+        source: Union[str, Path],
+        target: Union[str, Path, bytearray, memoryview],
+        part_size: int = 8 * MIB,
+        max_workers: int = 16,
+        verify: bool = True,
+    ) -> int:
+        """
+        Download a large object with concurrent ranged GET requests.
+
+        Ranges are written straight into their final place: a preallocated,
+        memory-mapped file or a caller-provided writable buffer. For multipart
+        objects the ranges follow the original part boundaries, so the data can
+        be checked against the (multipart) ETag.
+
+        Parameters
+        ----------
+        source : Union[str, Path]
+            remote file path.
+        target : Union[str, Path, bytearray, memoryview]
+            local file path, or a writable buffer at least as large as the object.
+        part_size : int, optional
+            Range size for single part objects, by default 8 MiB.
+        max_workers : int, optional
+            Number of concurrent ranged GET requests, by default 16.
+        verify : bool, optional
+            Check the downloaded data against the object ETag, by default True.
+            Skipped for SSE-KMS objects, whose ETag is not an MD5.
+
+        Returns
+        -------
+        int
+            Object size in bytes.
+        """
+        key = str(source)
+        head = self.client.head_object(Bucket=self.name, Key=key)
+        size, etag = head["ContentLength"], head["ETag"]
+
+        if "-" in etag:
+            first = self.client.head_object(Bucket=self.name, Key=key, PartNumber=1)
+            part_size = first["ContentLength"]
+        verify = verify and head.get("ServerSideEncryption") != "aws:kms"
+
+        if isinstance(target, (bytearray, memoryview)):
+            if len(target) < size:
+                raise ValueError(f"Target buffer is smaller than {size} bytes.")
+            with memoryview(target).cast("B") as view:
+                self._fetch_ranges(
+                    key, etag, size, part_size, view, max_workers, verify
+                )
+            return size
+
+        with open(target, "wb+") as file:
+            file.truncate(size)
+            if size:
+                with mmap.mmap(file.fileno(), size) as mapped:
+                    with memoryview(mapped) as view:
+                        self._fetch_ranges(
+                            key, etag, size, part_size, view, max_workers, verify
+                        )
+                    mapped.flush()
+
+        return size
+
+    def _fetch_ranges(
+        self,
+        key: str,
+        etag: str,
+        size: int,
+        part_size: int,
+        view: memoryview,
+        max_workers: int,
+        verify: bool,
+    ):
+        """Fetch `part_size` ranges of an object concurrently into a buffer."""
+
+        def fetch(number: int) -> bytes:
+            start = number * part_size
+            end = min(start + part_size, size)
+            response = self.client.get_object(
+                Bucket=self.name,
+                Key=key,
+                Range=f"bytes={start}-{end - 1}",
+                IfMatch=etag,
+            )
+            digest = hashlib.md5()
+            position = start
+            for chunk in response["Body"].iter_chunks(MIB):
+                view[position : position + len(chunk)] = chunk
+                digest.update(chunk)
+                position += len(chunk)
+            if position != end:
+                raise IOError(f"Incomplete range {start}-{end - 1} of {key}.")
+            return digest.digest()
+
+        digests: Dict[int, bytes] = dict()
+        numbers = range(math.ceil(size / part_size))
+        for number, digest, error in bounded_map(fetch, numbers, max_workers):
+            if error is not None:
+                raise error
+            digests[number] = digest
+
+        if not verify:
+            return
+
+        if "-" in etag:
+            joined = b"".join(digests[n] for n in sorted(digests))
+            actual = f"{hashlib.md5(joined).hexdigest()}-{len(digests)}"
+        else:
+            actual = hashlib.md5(view[:size]).hexdigest()
+
+        if actual != etag.strip('"'):
+            raise IOError(f"Checksum mismatch for {key}: {actual} != {etag}.")
+
+    def upload_dir(
+        self,
+        source: Union[str, Path],
+        target: str = "",
+        max_workers: int = 8,
+        **kwargs,
+    ) -> TransferReport:
+        """
+        Upload a local directory tree to S3.
+
+        Files are discovered lazily and uploaded on a bounded thread pool that
+        shares this bucket's client.
+
+        Parameters
+        ----------
+        source : Union[str, Path]
+            local directory.
+        target : str, optional
+            remote prefix, by default the bucket root.
+        max_workers : int, optional
+            Number of concurrent uploads, by default 8.
+        kwargs : dict, optional
+            Additional parameters passed to `upload`.
+
+        Returns
+        -------
+        TransferReport
+            Uploaded keys and sizes, failures and throughput.
+        """
+        source = Path(source)
+
+        files = ((_join_key(target, name), path) for name, path in _walk_files(source))
+
+        def upload(item: Tuple[str, Path]) -> int:
+            key, path = item
+            self.upload(path, key, **kwargs)  # type: ignore
+            return path.stat().st_size
+
+        return self._run_transfers(upload, files, max_workers)
+
+    def download_prefix(
+        self,
+        source: str,
+        target: Union[str, Path],
+        max_workers: int = 8,
+        **kwargs,
+    ) -> TransferReport:
+        """
+        Download every object under a prefix to a local directory.
+
+        Keys are streamed from `paginate_objects` and downloaded on a bounded
+        thread pool that shares this bucket's client. Keys whose local path
+        would fall outside `target` (e.g. 'data/../../x') are reported as
+        failures and not downloaded.
+
+        Parameters
+        ----------
+        source : str
+            remote prefix, a directory: 'data' matches 'data/a' but not 'data2/a'.
+        target : Union[str, Path]
+            local directory. Key paths relative to the prefix are preserved.
+        max_workers : int, optional
+            Number of concurrent downloads, by default 8.
+        kwargs : dict, optional
+            Additional parameters passed to `download`.
+
+        Returns
+        -------
+        TransferReport
+            Downloaded keys and sizes, failures and throughput.
+        """
+        target = Path(target)
+        source = _dir_prefix(source)
+
+        def objects() -> Iterator[Tuple[str, str, int]]:
+            for obj in self.iter_objects(source):
+                relative = obj["Key"][len(source) :].lstrip("/")
+                if relative and not obj["Key"].endswith("/"):
+                    yield obj["Key"], relative, obj["Size"]
+
+        def download(item: Tuple[str, str, int]) -> int:
+            key, relative, size = item
+            path = _local_path(target, relative)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.download(key, path, **kwargs)  # type: ignore
+            return size
+
+        return self._run_transfers(download, objects(), max_workers)
+
+    def sync(
+        self,
+        local_dir: Union[str, Path],
+        prefix: str = "",
+        direction: str = "upload",
+        check_etag: bool = True,
+        manifest: Optional[Union[str, Path]] = None,
+        max_workers: int = 8,
+        **kwargs,
+    ) -> TransferReport:
+        """
+        Synchronize a local directory and a prefix, transferring only differences.
+
+        A file is transferred when it is missing on the other side or its size
+        differs. Files with the same size are compared by ETag (multipart aware)
+        or, if `check_etag` is False, by modification time. Local ETags are cached
+        in a manifest file, so unchanged files are hashed only once.
+
+        Parameters
+        ----------
+        local_dir : Union[str, Path]
+            local directory.
+        prefix : str, optional
+            remote prefix, a directory, by default the bucket root. Downloaded
+            keys resolving outside of `local_dir` are reported as failures.
+        direction : str, optional
+            'upload' (local to S3) or 'download' (S3 to local), by default 'upload'.
+        check_etag : bool, optional
+            Compare contents by ETag, by default True. Disable it for objects whose
+            ETag is not an MD5 (e.g. SSE-KMS encrypted).
+        manifest : Optional[Union[str, Path]], optional
+            Manifest file path, by default '.botree-sync.json' in `local_dir`.
+        max_workers : int, optional
+            Number of concurrent transfers, by default 8.
+        kwargs : dict, optional
+            Additional parameters passed to `upload` or `download`.
+
+        Returns
+        -------
+        TransferReport
+            Transferred keys and sizes, failures, skipped count and throughput.
+        """
+        if direction not in ("upload", "download"):
+            raise ValueError(f"Invalid sync direction: {direction}")
+
+        local_dir = Path(local_dir)
+        local_dir.mkdir(parents=True, exist_ok=True)
+        prefix = _dir_prefix(prefix)
+        cache = SyncManifest(manifest or local_dir / ".botree-sync.json")
+
+        remote = {
+            obj["Key"]: obj
+            for obj in self.iter_objects(prefix)
+            if not obj["Key"].endswith("/")
+        }
+
+        def unchanged(name: str, path: Path, obj: Optional[dict]) -> bool:
+            return cache.is_synced(name, path, obj, direction, check_etag)
+
+        def upload(item: Tuple[str, str, Path]) -> Optional[int]:
+            key, name, path = item
+            if unchanged(name, path, remote.get(key)):
+                return None
+            self.upload(path, key, **kwargs)  # type: ignore
+            return path.stat().st_size
+
+        def download(item: Tuple[str, str]) -> Optional[int]:
+            key, name = item
+            path = _local_path(local_dir, name)
+            obj = remote[key]
+            if unchanged(name, path, obj):
+                return None
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.download(key, path, **kwargs)  # type: ignore
+            modified = obj["LastModified"].timestamp()
+            os.utime(path, (modified, modified))
+            cache.remember(name, path, obj["ETag"])
+            return obj["Size"]
+
+        excluded = {cache.path.name, cache.path.name + ".tmp"}
+        local_files = (
+            (_join_key(prefix, name), name, path)
+            for name, path in _walk_files(local_dir)
+            if path.name not in excluded
+        )
+        names = ((key, key[len(prefix) :].lstrip("/")) for key in remote)
+        remote_files = ((key, name) for key, name in names if name)
+
+        try:
+            if direction == "upload":
+                return self._run_transfers(upload, local_files, max_workers)
+            return self._run_transfers(download, remote_files, max_workers)
+        finally:
+            cache.save()
+
+    def copy_prefix(
+        self,
+        source_prefix: str,
+        target_prefix: str,
+        source_bucket: Optional[str] = None,
+        max_workers: int = 8,
+        multipart_threshold: int = COPY_MULTIPART_THRESHOLD,
+        part_size: int = 64 * MIB,
+        checkpoint: Optional[Union[str, Path]] = None,
+    ) -> TransferReport:
+        """
+        Server-side copy of every object under a prefix, concurrently.
+
+        Keys are listed lazily. Objects larger than `multipart_threshold` are
+        copied in `part_size` ranges with upload_part_copy, which is also required
+        for objects above the 5 GB copy_object limit. Each key keeps its path
+        relative to `source_prefix`, appended to `target_prefix`. Prefixes are
+        directories: 'data' matches 'data/a' but not 'data2/a'.
+
+        Within one bucket, a target inside the source (e.g. 'data/' to
+        'data/archive/') is not copied into itself: keys under the target are
+        skipped. A source inside the target would overwrite the objects being
+        copied, and raises ValueError.
+
+        Parameters
+        ----------
+        source_prefix : str
+            prefix to copy from.
+        target_prefix : str
+            prefix to copy to, in this bucket.
+        source_bucket : Optional[str], optional
+            bucket from wich objects will be copied from, by default this bucket.
+        max_workers : int, optional
+            Number of concurrent copies (and of concurrent parts per multipart
+            copy), by default 8.
+        multipart_threshold : int, optional
+            Size in bytes above which multipart copy is used, by default 256 MiB.
+        part_size : int, optional
+            Multipart copy part size in bytes, by default 64 MiB.
+        checkpoint : Optional[Union[str, Path]], optional
+            File recording copied keys. Keys already recorded there are skipped,
+            so an interrupted copy can be resumed by running it again with the
+            same checkpoint, by default None.
+
+        Returns
+        -------
+        TransferReport
+            Copied target keys and sizes, failures, resumed (skipped) count
+            and throughput.
+        """
+        source = self.name if source_bucket is None else source_bucket
+        source_prefix = _dir_prefix(source_prefix)
+        target_prefix = _dir_prefix(target_prefix)
+        nested = source == self.name and target_prefix.startswith(source_prefix)
+        if source == self.name and source_prefix.startswith(target_prefix):
+            raise ValueError(
+                f"Cannot copy {source_prefix!r} into the overlapping {target_prefix!r}"
+            )
+
+        listing = Bucket(
+            self.session, source, client_kwargs=self.client_kwargs, clients=self.clients
+        )
+        done = set()
+        lock = threading.Lock()
+
+        if checkpoint is not None and Path(checkpoint).is_file():
+            done = set(Path(checkpoint).read_text(encoding="utf-8").splitlines())
+
+        def copy(item: Tuple[str, str, int]) -> Optional[int]:
+            target, key, size = item
+            if key in done:
+                return None
+            if size > multipart_threshold:
+                self._multipart_copy(source, key, target, size, part_size, max_workers)
+            else:
+                self.client.copy_object(
+                    CopySource={"Bucket": source, "Key": key},
+                    Bucket=self.name,
+                    Key=target,
+                )
+            if checkpoint is not None:
+                with lock, open(checkpoint, "a", encoding="utf-8") as file:
+                    file.write(key + "\n")
+            return size
+
+        objects = (
+            (target_prefix + obj["Key"][len(source_prefix) :], obj["Key"], obj["Size"])
+            for obj in listing.iter_objects(source_prefix)
+            if not (nested and obj["Key"].startswith(target_prefix))
+        )
+
+        return self._run_transfers(copy, objects, max_workers)
+
+    def _multipart_copy(
+        self,
+        source_bucket: str,
+        key: str,
+        target: str,
+        size: int,
+        part_size: int,
+        max_workers: int,
+    ):
+        """
+        Copy a large object with concurrent upload_part_copy requests.
+
+        Headers, storage class, encryption settings and tags of the source are
+        kept, like copy_object does. Parts grow as needed to stay within
+        `MAX_PARTS`, so objects up to the 5 TB S3 maximum can be copied.
+        """
+        head = self.client.head_object(Bucket=source_bucket, Key=key)
+        params = {name: head[name] for name in COPIED_HEADERS if name in head}
+        tags = self.client.get_object_tagging(Bucket=source_bucket, Key=key)
+        if tags.get("TagSet"):
+            params["Tagging"] = urlencode(
+                [(tag["Key"], tag["Value"]) for tag in tags["TagSet"]]
+            )
+
+        upload = self.client.create_multipart_upload(
+            Bucket=self.name, Key=target, **params
+        )
+        upload_id = upload["UploadId"]
+        part_size = max(part_size, math.ceil(size / MAX_PARTS))
+
+        def copy_part(number: int) -> dict:
+            first = (number - 1) * part_size
+            last = min(first + part_size, size) - 1
+            response = self.client.upload_part_copy(
+                Bucket=self.name,
+                Key=target,
+                UploadId=upload_id,
+                PartNumber=number,
+                CopySource={"Bucket": source_bucket, "Key": key},
+                CopySourceRange=f"bytes={first}-{last}",
+            )
+            return {"PartNumber": number, "ETag": response["CopyPartResult"]["ETag"]}
+
+        try:
+            parts = []
+            numbers = range(1, math.ceil(size / part_size) + 1)
+            for _, part, error in bounded_map(copy_part, numbers, max_workers):
+                if error is not None:
+                    raise error
+                parts.append(part)
+
+            self.client.complete_multipart_upload(
+                Bucket=self.name,
+                Key=target,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": sorted(parts, key=itemgetter("PartNumber"))},
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(
+                Bucket=self.name, Key=target, UploadId=upload_id
+            )
+            raise
+
+    def delete_many(
+        self,
+        keys: Iterable[Union[str, Path]],
+        max_workers: int = 8,
+        dry_run: bool = False,
+    ) -> TransferReport:
+        """
+        Delete many files using batched DeleteObjects requests.
+
+        Keys are grouped lazily into batches of 1000 that are deleted
+        concurrently.
+
+        Parameters
+        ----------
+        keys : Iterable[Union[str, Path]]
+            remote file paths. May be a generator.
+        max_workers : int, optional
+            Number of concurrent DeleteObjects requests, by default 8.
+        dry_run : bool, optional
+            Only count the keys, without deleting anything, by default False.
+
+        Returns
+        -------
+        TransferReport
+            Deleted keys, per-key errors and duration. Sizes are unknown and
+            reported as 0.
+        """
+        return self._delete_objects(
+            ((str(key), 0) for key in keys), max_workers, dry_run
+        )
+
+    def delete_prefix(
+        self, prefix: str, max_workers: int = 8, dry_run: bool = False
+    ) -> TransferReport:
+        """
+        Delete every object under a prefix.
+
+        Keys are streamed from `paginate_objects` into batched, concurrent
+        DeleteObjects requests.
+
+        Parameters
+        ----------
+        prefix : str
+            S3 prefix, a directory: 'logs' deletes 'logs/a' but not
+            'logs-archive/a'. An empty prefix deletes the whole bucket content.
+        max_workers : int, optional
+            Number of concurrent DeleteObjects requests, by default 8.
+        dry_run : bool, optional
+            Only count objects and bytes, without deleting anything,
+            by default False.
+
+        Returns
+        -------
+        TransferReport
+            Deleted keys and sizes, per-key errors and duration.
+        """
+        prefix = _dir_prefix(prefix)
+        objects = ((obj["Key"], obj["Size"]) for obj in self.iter_objects(prefix))
+        return self._delete_objects(objects, max_workers, dry_run)
+
+    def _delete_objects(
+        self, objects: Iterable[Tuple[str, int]], max_workers: int, dry_run: bool
+    ) -> TransferReport:
+        """Delete (key, size) pairs in concurrent DeleteObjects batches."""
+        report = TransferReport()
+        start = time.perf_counter()
+
+        def delete_batch(batch: List[Tuple[str, int]]) -> List[dict]:
+            if dry_run:
+                return []
+            response = self.client.delete_objects(
+                Bucket=self.name,
+                Delete={"Objects": [{"Key": key} for key, _ in batch], "Quiet": True},
+            )
+            return response.get("Errors", [])  # type: ignore
+
+        batches = chunked(objects, DELETE_BATCH_SIZE)
+        for batch, errors, error in bounded_map(delete_batch, batches, max_workers):
+            failed = {key: error for key, _ in batch} if error else dict()
+            for item in errors or []:
+                failed[item["Key"]] = ClientError(
+                    {"Error": {"Code": item["Code"], "Message": item["Message"]}},
+                    "DeleteObjects",
+                )
+            report.failed.update(failed)  # type: ignore
+            report.transferred.update((k, s) for k, s in batch if k not in failed)
+
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def _run_transfers(self, function, items, max_workers: int) -> TransferReport:
+        """Run transfers concurrently, reporting them by key (first item field)."""
+        report = TransferReport()
+        start = time.perf_counter()
+
+        for item, size, error in bounded_map(function, items, max_workers):
+            if error is not None:
+                report.failed[item[0]] = error
+            elif size is None:
+                report.skipped += 1
+            else:
+                report.transferred[item[0]] = size
+
+        report.seconds = time.perf_counter() - start
+        return report
+
     def delete(self, target: Path, **kwargs):
         """
         Delete a file from S3.
@@ -177,10 +1521,18 @@ class Bucket:
 class S3:
     """AWS S3 operations."""
 
-    def __init__(self, session: Session, **kwargs):
+    def __init__(
+        self, session: Session, clients: Optional[ClientRegistry] = None, **kwargs
+    ):
         """S3 class init."""
         self.session = session
-        self.client = self.session.client(service_name="s3", **kwargs)
+        self.client_kwargs = kwargs
+        self.clients = clients if clients is not None else ClientRegistry(session)
+
+    @property
+    def client(self):
+        """Shared S3 client, created on first use."""
+        return self.clients.client("s3", **self.client_kwargs)
 
     def create_bucket(self, name: str, *args, **kwargs):
         """Create a bucket."""
@@ -196,6 +1548,20 @@ class S3:
         name: str,
         client_kwargs: dict = dict(),
         resource_kwargs: dict = dict(),
+        cache: Optional[ObjectCache] = None,
     ) -> Bucket:
-        """Get a bucket resource instance."""
-        return Bucket(self.session, name, **client_kwargs, **resource_kwargs)
+        """
+        Get a bucket resource instance.
+
+        The bucket shares this instance's client registry, so building many
+        buckets does not create new boto3 clients. Pass an `ObjectCache` to
+        serve downloads from a local read-through cache.
+        """
+        return Bucket(
+            self.session,
+            name,
+            client_kwargs=client_kwargs or self.client_kwargs,
+            resource_kwargs=resource_kwargs,
+            clients=self.clients,
+            cache=cache,
+        )
@@ -1,15 +1,290 @@
 """Botree Secrets Manager utilities."""
 
 import json
+import threading
+import time
 import uuid
 
+from collections import OrderedDict
 from datetime import datetime
+from types import MappingProxyType
 from typing import Any
+from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from boto3.session import Session
+from botocore.exceptions import ClientError
+
+from botree.clients import ClientRegistry
+from botree.utils import bounded_map
+from botree.utils import chunked
+
+
+BATCH_GET_SIZE = 20
+"""Maximum number of secrets accepted by a BatchGetSecretValue request."""
+
+
+PARSED_CACHE_SIZE = 1024
+"""Number of decoded secret versions kept in memory by `SecretValue`."""
+
+_parsed: "OrderedDict[Tuple[str, str], Any]" = OrderedDict()
+_parsed_lock = threading.Lock()
+
+
+class SecretValue(Mapping[str, Any]):
+    """
+    A secret version, decoded lazily.
+
+    The JSON payload of `SecretString` is parsed on first access and memoized
+    per secret version, so reading the same version again (even from another
+    `SecretValue`) does not parse it twice. JSON objects are exposed read-only,
+    with field access like `secret["password"]`. `SecretBinary` is exposed as a
+    memoryview, without copying.
+    """
+
+    def __init__(self, response: Dict[str, Any]):
+        """
+        Secret value init.
+
+        Parameters
+        ----------
+        response : Dict[str, Any]
+            A get_secret_value (or batch_get_secret_value item) response.
+        """
+        self.response = response
+        self.name: str = response.get("Name", "")
+        self.arn: str = response.get("ARN", "")
+        self.version_id: Optional[str] = response.get("VersionId")
+        self.string: Optional[str] = response.get("SecretString")
+        binary = response.get("SecretBinary")
+        self.binary: Optional[memoryview] = (
+            None if binary is None else memoryview(binary)
+        )
+
+    @property
+    def value(self) -> Any:
+        """Decoded JSON payload (read-only if it is an object)."""
+        if self.string is None:
+            raise ValueError(f"Secret {self.name} has no SecretString.")
+
+        key = (self.arn or self.name, self.version_id or "")
+        if self.version_id is None:
+            return _decode(self.string)
+
+        with _parsed_lock:
+            if key in _parsed:
+                _parsed.move_to_end(key)
+                return _parsed[key]
+
+        value = _decode(self.string)
+        with _parsed_lock:
+            _parsed[key] = value
+            while len(_parsed) > PARSED_CACHE_SIZE:
+                _parsed.popitem(last=False)
+
+        return value
+
+    def __getitem__(self, field: str) -> Any:
+        """Get a field of a JSON object payload."""
+        return self.value[field]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the JSON object payload fields."""
+        return iter(self.value)
+
+    def __len__(self) -> int:
+        """Number of fields of the JSON object payload."""
+        return len(self.value)
+
+    def __repr__(self) -> str:
+        """Never show the secret itself."""
+        return f"SecretValue(name={self.name!r}, version_id={self.version_id!r})"
+
+
+def _decode(string: str) -> Any:
+    """Parse a JSON secret, wrapping objects in read-only mappings."""
+    value = json.loads(string)
+    return MappingProxyType(value) if isinstance(value, dict) else value
+
+
+def _unsupported(error: ClientError) -> bool:
+    """Tell if an error means the endpoint does not implement the operation."""
+    code = error.response["Error"]["Code"]
+    return code in ("UnknownOperationException", "InvalidAction", "NotImplemented")
+
+
+def _batch_denied(error: BaseException) -> bool:
+    """Tell if a batch request failed because the batch API can't be used."""
+    if not isinstance(error, ClientError):
+        return False
+    return _unsupported(error) or error.response["Error"]["Code"] == "AccessDenied"
+
+
+class _CachedSecret:
+    """A cache entry and the lock serializing its refreshes."""
+
+    value: Optional[dict]
+
+    def __init__(self):
+        self.value = None
+        self.expires = 0.0
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+
+class SecretCache:
+    """
+    In-process cache of `get_secret_value` responses.
+
+    Entries are keyed by secret name, version id and version stage and kept
+    for a time to live (TTL), configurable per secret. Concurrent requests for
+    a missing or expired secret trigger a single fetch (the others wait for
+    it). Entries close to expiry are refreshed in the background while the
+    cached value keeps being served, and the least recently used entries are
+    dropped above `max_size`.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[..., dict],
+        ttl: float = 300.0,
+        max_size: int = 1024,
+        refresh_ahead: float = 30.0,
+        ttls: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Secret cache init.
+
+        Parameters
+        ----------
+        fetch : Callable[..., dict]
+            Function getting a secret, called as fetch(SecretId=..., **kwargs).
+        ttl : float, optional
+            Default time to live, in seconds, by default 300.
+        max_size : int, optional
+            Maximum number of cached secret versions, by default 1024.
+        refresh_ahead : float, optional
+            Refresh entries in the background when they are read less than
+            this many seconds (at most half their TTL) before expiry,
+            by default 30. Use 0 to disable.
+        ttls : Optional[Dict[str, float]], optional
+            Per-secret time to live, overriding `ttl`, by default None.
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_size = max_size
+        self.refresh_ahead = refresh_ahead
+        self.ttls = dict(ttls or {})
+        self._entries: "OrderedDict[Tuple, _CachedSecret]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        name: str,
+        version_id: Optional[str] = None,
+        version_stage: Optional[str] = None,
+    ) -> dict:
+        """
+        Get a secret, from the cache when possible.
+
+        Parameters
+        ----------
+        name : str
+            Secret name.
+        version_id : Optional[str], optional
+            Secret version id, by default None.
+        version_stage : Optional[str], optional
+            Secret version stage, by default None (AWSCURRENT).
+
+        Returns
+        -------
+        dict
+            A copy of the get_secret_value response.
+        """
+        key = (name, version_id, version_stage)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _CachedSecret()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        now = time.monotonic()
+        if entry.value is None or now >= entry.expires:
+            with entry.lock:
+                if entry.value is None or time.monotonic() >= entry.expires:
+                    self._refresh(key, entry)
+        elif now >= entry.expires - self._refresh_window(name):
+            self._start_refresh(key, entry)
+
+        return dict(entry.value)  # type: ignore
+
+    def _refresh_window(self, name: str) -> float:
+        """Time before expiry when reads refresh an entry, at most half its TTL."""
+        return min(self.refresh_ahead, self.ttls.get(name, self.ttl) / 2)
+
+    def _start_refresh(self, key: Tuple, entry: _CachedSecret):
+        """Start a background refresh, unless the entry is already being fetched."""
+        if not entry.lock.acquire(blocking=False):
+            return
+        try:
+            if entry.refreshing:
+                return
+            entry.refreshing = True
+        finally:
+            entry.lock.release()
+
+        threading.Thread(
+            target=self._refresh_ahead, args=(key, entry), daemon=True
+        ).start()
+
+    def _refresh(self, key: Tuple, entry: _CachedSecret):
+        """Fetch a secret version into its entry."""
+        name, version_id, version_stage = key
+        kwargs = dict()
+        if version_id is not None:
+            kwargs["VersionId"] = version_id
+        if version_stage is not None:
+            kwargs["VersionStage"] = version_stage
+
+        entry.value = self.fetch(SecretId=name, **kwargs)
+        entry.expires = time.monotonic() + self.ttls.get(name, self.ttl)
+
+    def _refresh_ahead(self, key: Tuple, entry: _CachedSecret):
+        """Background refresh. Failures keep the current value until expiry."""
+        try:
+            with entry.lock:
+                self._refresh(key, entry)
+        except Exception:
+            pass
+        finally:
+            entry.refreshing = False
+
+    def invalidate(self, name: Optional[str] = None):
+        """
+        Drop cached versions of a secret, or of every secret.
+
+        Parameters
+        ----------
+        name : Optional[str], optional
+            Secret name, by default None (clear the whole cache).
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if name is None or key[0] == name:
+                    del self._entries[key]
+
+    def __len__(self) -> int:
+        """Number of cached secret versions."""
+        return len(self._entries)
 
 
 class SecretsManager:
@@ -19,17 +294,60 @@ class SecretsManager:
         self,
         session: Session,
         client_kwargs: dict = dict(),
+        clients: Optional[ClientRegistry] = None,
+        cache: Optional[SecretCache] = None,
     ):
         self.session = session
-        self.client = self.session.client(
-            service_name="secretsmanager", **client_kwargs
+        self.client_kwargs = client_kwargs
+        self.clients = clients if clients is not None else ClientRegistry(session)
+        self.cache = cache
+
+    def enable_cache(
+        self,
+        ttl: float = 300.0,
+        max_size: int = 1024,
+        refresh_ahead: float = 30.0,
+        ttls: Optional[Dict[str, float]] = None,
+    ) -> SecretCache:
+        """
+        Cache `get_secret` results in memory.
+
+        Parameters
+        ----------
+        ttl : float, optional
+            Default time to live, in seconds, by default 300.
+        max_size : int, optional
+            Maximum number of cached secret versions, by default 1024.
+        refresh_ahead : float, optional
+            Background refresh window before expiry, in seconds, by default 30.
+        ttls : Optional[Dict[str, float]], optional
+            Per-secret time to live, by default None.
+
+        Returns
+        -------
+        SecretCache
+            The new cache.
+        """
+        self.cache = SecretCache(
+            lambda **kwargs: self.client.get_secret_value(**kwargs),
+            ttl=ttl,
+            max_size=max_size,
+            refresh_ahead=refresh_ahead,
+            ttls=ttls,
         )
+        return self.cache
+
+    @property
+    def client(self):
+        """Shared Secrets Manager client, created on first use."""
+        return self.clients.client("secretsmanager", **self.client_kwargs)
 
     def list_secrets(self, *args, **kwargs) -> dict:
         """
         Returns a list of all stored secrets.
 
         Actually, this returns a list of all secrets within the Boto3 limit of 100.
+        Use `iter_secrets` to go through all of them.
 
         Returns
         -------
@@ -40,6 +358,84 @@ class SecretsManager:
 
         return secrets
 
+    def iter_secrets(
+        self,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        names_only: bool = False,
+        page_size: int = 100,
+        **kwargs,
+    ) -> Iterator[Union[str, Dict[str, Any]]]:
+        """
+        Iterate over all stored secrets, fetching pages lazily.
+
+        Parameters
+        ----------
+        filters : Optional[List[Dict[str, Any]]], optional
+            Server side filters, e.g. [{"Key": "name", "Values": ["prod/"]}],
+            by default None.
+        names_only : bool, optional
+            Yield only secret names instead of their metadata, by default False.
+        page_size : int, optional
+            Number of secrets requested per page (at most 100), by default 100.
+        kwargs : dict, optional
+            Additional parameters passed to `list_secrets` (e.g. SortOrder).
+
+        Yields
+        ------
+        Union[str, Dict[str, Any]]
+            Secret names or metadata entries.
+        """
+        if filters:
+            kwargs["Filters"] = filters
+
+        paginator = self.client.get_paginator("list_secrets")
+        pages = paginator.paginate(PaginationConfig={"PageSize": page_size}, **kwargs)
+
+        for page in pages:
+            for secret in page.get("SecretList", []):
+                yield secret["Name"] if names_only else secret
+
+    def describe_secrets(
+        self,
+        names: Optional[Iterable[str]] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        max_workers: int = 8,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Describe many secrets concurrently, e.g. for inventory jobs.
+
+        Secrets deleted while running are skipped.
+
+        Parameters
+        ----------
+        names : Optional[Iterable[str]], optional
+            Secret names (or ARNs), by default every secret matching `filters`.
+        filters : Optional[List[Dict[str, Any]]], optional
+            Server side filters used when `names` is not given, by default None.
+        max_workers : int, optional
+            Number of concurrent describe_secret requests, by default 8.
+
+        Yields
+        ------
+        Dict[str, Any]
+            describe_secret responses, in completion order.
+        """
+        if names is None:
+            names = self.iter_secrets(filters=filters, names_only=True)  # type: ignore
+
+        def describe(name: str) -> Dict[str, Any]:
+            return self.client.describe_secret(SecretId=name)
+
+        described = bounded_map(describe, names, max_workers)  # type: ignore
+        for _, description, error in described:
+            if error is None:
+                yield description
+            elif not (
+                isinstance(error, ClientError)
+                and error.response["Error"]["Code"] == "ResourceNotFoundException"
+            ):
+                raise error
+
     def generate_password(
         self,
         length: int = 32,
@@ -133,6 +529,9 @@ class SecretsManager:
 
         response = self.client.delete_secret(SecretId=name, **kwargs)
 
+        if self.cache is not None:
+            self.cache.invalidate(name)
+
         return response
 
     def get_secret(
@@ -141,6 +540,9 @@ class SecretsManager:
         """
         Get a secret from AWS Secrets Manager by name.
 
+        When the cache is enabled (see `enable_cache`), the secret is served
+        from memory until its time to live expires.
+
         Parameters
         ----------
         name : str
@@ -151,10 +553,115 @@ class SecretsManager:
         Dict[str, Union[str, Dict[str, str], List[str], int, datetime]]
             Chosen secret.
         """
+        if (
+            self.cache is not None
+            and not args
+            and set(kwargs)
+            <= {
+                "VersionId",
+                "VersionStage",
+            }
+        ):
+            return self.cache.get(
+                name, kwargs.get("VersionId"), kwargs.get("VersionStage")
+            )
+
         secret = self.client.get_secret_value(SecretId=name, *args, **kwargs)
 
         return secret
 
+    def get_secret_value(self, name: str, **kwargs) -> SecretValue:
+        """
+        Get a secret with its payload decoded lazily, once per version.
+
+        Goes through `get_secret`, so the in-memory cache applies when enabled.
+
+        Parameters
+        ----------
+        name : str
+            Secret name as in AWS Secrets Manager.
+
+        Returns
+        -------
+        SecretValue
+            Chosen secret, e.g. secret_value["password"].
+        """
+        return SecretValue(self.get_secret(name, **kwargs))
+
+    def get_secrets(
+        self, names: Iterable[str], max_workers: int = 8
+    ) -> Tuple[Dict[str, dict], Dict[str, BaseException]]:
+        """
+        Get many secrets at once.
+
+        Uses BatchGetSecretValue, 20 secrets per request. If the batch API is
+        not available (old botocore, or an endpoint not supporting it) or is
+        denied by IAM, the secrets of a batch are fetched one by one with
+        get_secret_value instead. Any other batch error (e.g. throttling) is
+        reported under each name of the batch, keeping the other results.
+        Requests run concurrently in all cases.
+
+        Parameters
+        ----------
+        names : Iterable[str]
+            Secret names (or ARNs).
+        max_workers : int, optional
+            Number of concurrent requests, by default 8.
+
+        Returns
+        -------
+        Tuple[Dict[str, dict], Dict[str, BaseException]]
+            Secrets by requested name, and errors by requested name.
+        """
+        names = list(dict.fromkeys(names))
+        secrets: Dict[str, dict] = dict()
+        errors: Dict[str, BaseException] = dict()
+        fallback: List[str] = list()
+
+        batches = chunked(names, BATCH_GET_SIZE)
+        for batch, result, failure in bounded_map(
+            self._batch_get, batches, max_workers
+        ):
+            if failure is None:
+                secrets.update(result[0])
+                errors.update(result[1])
+            elif isinstance(failure, AttributeError) or _batch_denied(failure):
+                fallback.extend(batch)
+            elif isinstance(failure, ClientError):
+                errors.update(dict.fromkeys(batch, failure))
+            else:
+                raise failure
+
+        for name, secret, failure in bounded_map(
+            self.get_secret, fallback, max_workers
+        ):
+            if failure is None:
+                secrets[name] = secret
+            else:
+                errors[name] = failure
+
+        return secrets, errors
+
+    def _batch_get(
+        self, names: List[str]
+    ) -> Tuple[Dict[str, dict], Dict[str, BaseException]]:
+        """Fetch up to 20 secrets with one BatchGetSecretValue request."""
+        response = self.client.batch_get_secret_value(SecretIdList=names)
+        found = dict()
+        for value in response.get("SecretValues", []):
+            found[value["Name"]] = value
+            found[value["ARN"]] = value
+
+        errors: Dict[str, BaseException] = dict()
+        for error in response.get("Errors", []):
+            errors[error["SecretId"]] = ClientError(
+                {"Error": {"Code": error["ErrorCode"], "Message": error["Message"]}},
+                "BatchGetSecretValue",
+            )
+
+        secrets = {name: found[name] for name in names if name in found}
+        return secrets, errors
+
     def create_secret(
         self, name: str, secret: Dict[str, Any], description: str, *args, **kwargs
     ) -> Dict[str, Union[str, Dict[str, str], List[str], int, datetime]]:
@@ -0,0 +1,289 @@
+"""Botree shared helpers."""
+
+import queue
+import random
+import sys
+import threading
+import time
+
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from itertools import islice
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+
+def bounded_map(
+    function: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = 8,
+) -> Iterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Run `function` over `items` on a thread pool, consuming `items` lazily.
+
+    At most `2 * max_workers` tasks are in flight at any time, so huge (or
+    infinite) iterables never get materialized in memory.
+
+    Parameters
+    ----------
+    function : Callable[[Any], Any]
+        Function applied to every item.
+    items : Iterable[Any]
+        Items to process, read only as workers become available.
+    max_workers : int, optional
+        Number of worker threads, by default 8.
+
+    Yields
+    ------
+    Tuple[Any, Any, Optional[BaseException]]
+        The item, the function result (None on failure) and the raised
+        exception (None on success), in completion order.
+    """
+    iterator = iter(items)
+    pending: Dict[Future, Any] = dict()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def fill():
+            while len(pending) < 2 * max_workers:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                pending[executor.submit(function, item)] = item
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                error = future.exception()
+                yield item, None if error else future.result(), error
+            fill()
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """
+    Lazily split an iterable into lists of at most `size` items.
+
+    Parameters
+    ----------
+    items : Iterable[Any]
+        Items to split.
+    size : int
+        Maximum chunk length.
+
+    Yields
+    ------
+    List[Any]
+        Consecutive chunks.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class FileLock:
+    """
+    Exclusive lock backed by a lock file, safe across threads and processes.
+
+    Uses `fcntl.flock` on POSIX systems and `msvcrt.locking` on Windows.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        File lock init.
+
+        Parameters
+        ----------
+        path : Union[str, Path]
+            Lock file path. Created if missing and never deleted.
+        """
+        self.path = Path(path)
+        self._file = None
+
+    def acquire(self):
+        """Block until the lock is acquired."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file = open(self.path, "a+b")
+
+        if sys.platform == "win32":
+            import msvcrt
+
+            while True:
+                try:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.05)
+        else:
+            import fcntl
+
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+        self._file = file
+
+    def release(self):
+        """Release the lock."""
+        file, self._file = self._file, None
+        if file is None:
+            return
+
+        if sys.platform == "win32":
+            import msvcrt
+
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+        file.close()
+
+    def __enter__(self) -> "FileLock":
+        """Acquire the lock."""
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        """Release the lock."""
+        self.release()
+
+
+def backoff(
+    initial: float = 0.5, maximum: float = 10.0, factor: float = 2.0
+) -> Iterator[float]:
+    """
+    Exponential backoff delays, with jitter.
+
+    Each delay is drawn between half and all of the current exponential step
+    (equal jitter), so concurrent pollers spread out instead of synchronizing.
+
+    Parameters
+    ----------
+    initial : float, optional
+        First step, in seconds, by default 0.5.
+    maximum : float, optional
+        Largest step, in seconds, by default 10.
+    factor : float, optional
+        Growth factor between steps, by default 2.
+
+    Yields
+    ------
+    float
+        Delays to sleep, in seconds.
+    """
+    step = initial
+    while True:
+        yield step / 2 + random.uniform(0, step / 2)
+        step = min(maximum, step * factor)
+
+
+def _put(items: queue.Queue, stop: threading.Event, value: Any) -> bool:
+    """Put a value in a bounded queue unless `stop` is set. Tell if it was put."""
+    while not stop.is_set():
+        try:
+            items.put(value, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _pump(iterable: Iterable[Any], items: queue.Queue, stop: threading.Event):
+    """Move items of an iterable to a queue, ending with a (None, error) pair."""
+    try:
+        for item in iterable:
+            if not _put(items, stop, (item, False)):
+                return
+    except BaseException as error:
+        _put(items, stop, (error, True))
+        return
+    _put(items, stop, (None, True))
+
+
+def interleave(
+    iterables: Iterable[Iterable[Any]], max_workers: int = 4, buffer: int = 1000
+) -> Iterator[Any]:
+    """
+    Consume several iterables on worker threads, yielding items as they come.
+
+    Items are passed through a bounded queue, so memory use stays constant
+    however fast the producers are. Producers stop when the consumer does.
+
+    Parameters
+    ----------
+    iterables : Iterable[Iterable[Any]]
+        Iterables to consume, e.g. generators doing blocking I/O.
+    max_workers : int, optional
+        Number of iterables consumed at the same time, by default 4.
+    buffer : int, optional
+        Maximum number of items waiting to be yielded, by default 1000.
+
+    Yields
+    ------
+    Any
+        Items of all iterables. Order is kept within each iterable only.
+    """
+    items: queue.Queue = queue.Queue(maxsize=buffer)
+    stop = threading.Event()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_pump, it, items, stop) for it in iterables]
+        pending = len(futures)
+        try:
+            while pending:
+                item, finished = items.get()
+                if not finished:
+                    yield item
+                elif item is not None:
+                    raise item
+                else:
+                    pending -= 1
+        finally:
+            stop.set()
+
+
+def to_frame(columns: Dict[str, List[Any]], backend: str = "pandas") -> Any:
+    """
+    Build a pandas DataFrame or a pyarrow Table from columns.
+
+    Parameters
+    ----------
+    columns : Dict[str, List[Any]]
+        Columns by name.
+    backend : str, optional
+        'pandas' or 'pyarrow', by default 'pandas'. The matching optional
+        package must be installed.
+
+    Returns
+    -------
+    pandas.DataFrame or pyarrow.Table
+        The table.
+    """
+    if backend not in ("pandas", "pyarrow"):
+        raise ValueError(f"Unknown backend: {backend}")
+
+    try:
+        if backend == "pyarrow":
+            import pyarrow
+
+            return pyarrow.table(columns)
+
+        import pandas
+
+        return pandas.DataFrame(columns)
+    except ImportError as error:
+        raise ImportError(f"The {backend} backend requires {backend}.") from error
@@ -0,0 +1,35 @@
+import asyncio
+
+from pathlib import Path
+
+from moto import mock_s3
+
+
+def test_async_bucket(botree_session, botree_test_bucket, text_file):
+    """Async upload, list, paginate, copy, download and delete."""
+
+    async def scenario(tmp_dir):
+        s3 = botree_session.async_s3
+        await s3.create_bucket(botree_test_bucket)
+        bucket = s3.bucket(botree_test_bucket)
+
+        await asyncio.gather(
+            *(bucket.upload(text_file, f"many/{i}.txt") for i in range(20))
+        )
+        assert len(await bucket.list_files("many/")) == 20
+        assert await bucket.list_folders() == ["many/"]
+
+        pages = [page async for page in bucket.paginate_objects("many/", 7)]
+        assert [len(page) for page in pages] == [7, 7, 6]
+
+        await bucket.copy(Path("many/1.txt"), Path("copied"))
+        assert await bucket.list_files("copied/") == ["copied/1.txt"]
+        await bucket.download("many/0.txt", tmp_dir / "downloaded.txt")
+        assert (tmp_dir / "downloaded.txt").read_text() == "botree test!"
+
+        await asyncio.gather(*(bucket.delete(f"many/{i}.txt") for i in range(20)))
+        assert await bucket.list_files("many/") == []
+        assert [page async for page in bucket.paginate_objects("many/")] == [[]]
+
+    with mock_s3():
+        asyncio.run(scenario(text_file.parent))
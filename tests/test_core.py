@@ -0,0 +1,80 @@
+import subprocess
+import sys
+
+import pytest
+
+from moto import mock_s3
+
+import botree
+
+
+IMPORT_BUDGET_US = 50000
+"""Maximum cumulative `import botree` time, in microseconds."""
+
+
+def test_services_share_clients(botree_session, botree_test_bucket):
+    """Repeated service access and bucket construction reuse one client."""
+    with mock_s3():
+        assert botree_session.s3 is botree_session.s3
+
+        client = botree_session.s3.client
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+
+        assert bucket.client is client
+        assert botree_session.s3.bucket(botree_test_bucket).client is client
+        assert len(botree_session.clients) == 1
+
+
+def test_clients_keyed_by_kwargs(botree_session):
+    """Different client parameters get different clients."""
+    with mock_s3():
+        default = botree_session.clients.client("s3")
+        other = botree_session.clients.client("s3", endpoint_url="http://localhost")
+
+        assert default is not other
+        assert botree_session.clients.client("s3") is default
+
+
+def test_session_close(botree_session, botree_test_bucket):
+    """Closing the session drops all cached clients."""
+    with mock_s3():
+        with botree_session as session:
+            session.s3.create_bucket(botree_test_bucket)
+            client = session.s3.client
+
+        assert len(botree_session.clients) == 0
+        assert botree_session.s3.client is not client
+
+
+def test_import_is_lazy():
+    """Importing botree stays under budget and does not import boto3."""
+    code = (
+        "import sys, botree; print('boto3' in sys.modules, 'botree.s3' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.split() == ["False", "False"]
+    line = next(
+        line for line in result.stderr.splitlines() if line.endswith("| botree")
+    )
+    assert int(line.split("|")[1]) < IMPORT_BUDGET_US
+
+
+def test_deferred_session():
+    """The boto3 session and the wrappers are built on first use."""
+    session = botree.Session("us-east-1")
+    assert session._session is None
+    assert session._services == {}
+
+    assert session.s3.session is session.session
+    assert session.clients.session is session.session
+    assert botree.bucket is botree.Bucket
+    assert botree.s3 is botree.S3
+
+    with pytest.raises(AttributeError):
+        botree.missing
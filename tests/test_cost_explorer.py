@@ -1,3 +1,10 @@
+from datetime import date
+from types import SimpleNamespace
+
+from botree.cost_explorer import CostCache
+from botree.cost_explorer import _period_closed
+
+
 def test_get_costs(botree_session, monkeypatch):
     """Get costs of AWS infrastructure based on time period."""
     monkeypatch.setattr(botree_session.cost_explorer.session, "client", mocked_ce)
@@ -50,3 +57,114 @@ class MockCe:
                 }
             ],
         }
+
+
+class MockPagedCe:
+    """Cost Explorer returning grouped results in two pages."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_cost_and_usage(self, **kwargs):
+        self.calls += 1
+        group = {"Keys": ["EC2" if "NextPageToken" in kwargs else "S3"]}
+        page = {
+            "ResultsByTime": [
+                {"TimePeriod": {"Start": "2023-07-01", "End": "2023-07-02"}}
+            ]
+        }
+        page["ResultsByTime"][0]["Groups"] = [group]
+        if "NextPageToken" not in kwargs:
+            page["NextPageToken"] = "next"
+        return page
+
+
+def test_get_costs_pages_and_cache(botree_session, monkeypatch, tmp_path):
+    """Pages are merged by period, and closed periods are served from disk."""
+    client = MockPagedCe()
+    monkeypatch.setattr(
+        botree_session.cost_explorer.session, "client", lambda **kw: client
+    )
+    cost_explorer = botree_session.cost_explorer
+    cache = cost_explorer.enable_cache(tmp_path)
+
+    time_period = {"Start": "2023-07-01", "End": "2023-07-02"}
+    response = cost_explorer.get_costs(time_period, "DAILY", ["UnblendedCost"])
+
+    assert "NextPageToken" not in response
+    assert len(response["ResultsByTime"]) == 1
+    groups = response["ResultsByTime"][0]["Groups"]
+    assert [group["Keys"] for group in groups] == [["S3"], ["EC2"]]
+
+    cached = cost_explorer.get_costs(time_period, "DAILY", ["UnblendedCost"])
+    assert cached == response
+    assert client.calls == 2
+    assert cache.hits == cache.misses == 1
+
+
+def test_cost_cache_expiry(tmp_path):
+    """Entries covering the current month expire after the TTL."""
+    cache = CostCache(tmp_path, ttl=0)
+    today = date.today().isoformat()
+    params = {"TimePeriod": {"Start": today, "End": "2999-01-01"}}
+
+    cache.get("get_cost_forecast", params, lambda: {"value": 1})
+    assert cache.get("get_cost_forecast", params, lambda: {"value": 2}) == {"value": 2}
+
+    assert _period_closed({"TimePeriod": {"End": "2023-07-01"}}, date(2023, 7, 5))
+    assert not _period_closed({"TimePeriod": {"End": "2023-07-02"}}, date(2023, 7, 5))
+
+
+class MockWindowCe:
+    """Cost Explorer returning one grouped result per requested window."""
+
+    def __init__(self):
+        self.periods = []
+        self.meta = SimpleNamespace(events=SimpleNamespace(register=self.register))
+        self.events = []
+
+    def register(self, event, handler, unique_id=None):
+        self.events.append(event)
+
+    def get_cost_and_usage(self, **kwargs):
+        period = kwargs["TimePeriod"]
+        self.periods.append(period)
+        group = {"Keys": ["S3"], "Metrics": {"UnblendedCost": {"Amount": "1.5"}}}
+        return {"ResultsByTime": [{"TimePeriod": period, "Groups": [group]}]}
+
+    def get_cost_forecast(self, **kwargs):
+        period = kwargs["TimePeriod"]
+        return {"ForecastResultsByTime": [{"TimePeriod": period, "MeanValue": "10"}]}
+
+
+def test_get_costs_table(botree_session, monkeypatch):
+    """Month windows are fetched concurrently and flattened in order."""
+    client = MockWindowCe()
+    monkeypatch.setattr(
+        botree_session.cost_explorer.session, "client", lambda **kw: client
+    )
+
+    table = botree_session.cost_explorer.get_costs_table(
+        {"Start": "2022-11-15", "End": "2023-02-01"},
+        "MONTHLY",
+        ["UnblendedCost"],
+        rate=100,
+        GroupBy=[{"Type": "DIMENSION", "Key": "SERVICE"}],
+    )
+
+    assert len(client.periods) == 3
+    assert "before-send" in client.events
+    assert table == {
+        "date": [date(2022, 11, 15), date(2022, 12, 1), date(2023, 1, 1)],
+        "SERVICE": ["S3"] * 3,
+        "metric": ["UnblendedCost"] * 3,
+        "amount": [1.5] * 3,
+    }
+
+    forecasts = botree_session.cost_explorer.get_forecasts_table(
+        {"Start": "2023-01-01", "End": "2023-03-01"}, "MONTHLY", "UnblendedCost"
+    )
+    assert forecasts["amount"] == [10.0, 10.0]
+    assert forecasts["upper"] == [None, None]
+    # The first rate set up the shared bucket, later defaults keep it
+    assert botree_session.clients.limits.services["ce"].max_rate == 100
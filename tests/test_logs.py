@@ -1,3 +1,25 @@
+import gzip
+import json
+import logging
+import time
+
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from botocore.exceptions import ClientError
+from moto import mock_logs
+
+from botree.logs import ExportCheckpoint
+from botree.logs import LogHandler
+from botree.logs import LogWriter
+from botree.logs import QueryError
+from botree.logs import _put_batches
+from botree.logs import results_to_columns
+from botree.logs import results_to_dataframe
+
+
 def test_execute_query(botree_session, monkeypatch):
     """Execute query on AWS CloudWatch Logs."""
     monkeypatch.setattr(botree_session.cost_explorer.session, "client", mocked_logs)
@@ -28,3 +50,393 @@ class MockLogs:
 
     def get_query_results(*args, **kwargs):
         return {"status": "Complete"}
+
+
+def test_query_handle_backoff(botree_session, monkeypatch):
+    """Queries are polled with backoff until complete."""
+    client = MockSlowLogs(polls_before_complete=3)
+    monkeypatch.setattr(botree_session.logs.session, "client", lambda **kw: client)
+
+    query = botree_session.logs.start_query(
+        ["/log/group/mock"], "query_string", 0, 1, poll_interval=0.01
+    )
+    assert query.result()["status"] == "Complete"
+    assert client.polls == 4
+
+
+def test_query_timeout_stops_query(botree_session, monkeypatch):
+    """Queries running past their timeout are stopped."""
+    client = MockSlowLogs(polls_before_complete=1000)
+    monkeypatch.setattr(botree_session.logs.session, "client", lambda **kw: client)
+
+    with pytest.raises(QueryError):
+        botree_session.logs.execute_query(
+            ["/log/group/mock"], "query_string", 0, 1, timeout=0.05
+        )
+    assert client.stopped == ["query-0"]
+
+
+def test_execute_queries(botree_session, monkeypatch):
+    """Many queries run under a concurrency limit, results kept in order."""
+    client = MockSlowLogs(polls_before_complete=2, failing={"query-2"})
+    monkeypatch.setattr(botree_session.logs.session, "client", lambda **kw: client)
+
+    queries = [
+        dict(
+            log_group_names=["/log/group/mock"],
+            query_string=f"query {i}",
+            start_time=0,
+            end_time=1,
+            poll_interval=0.01,
+        )
+        for i in range(5)
+    ]
+    results = botree_session.logs.execute_queries(
+        queries, max_concurrent=2, return_exceptions=True
+    )
+
+    assert [r["queryId"] for r in results if not isinstance(r, QueryError)] == [
+        "query-0",
+        "query-1",
+        "query-3",
+        "query-4",
+    ]
+    assert isinstance(results[2], QueryError)
+    assert client.max_running <= 2
+
+
+class MockSlowLogs:
+    """Logs client mock whose queries complete after a few polls."""
+
+    def __init__(self, polls_before_complete, failing=()):
+        self.polls_before_complete = polls_before_complete
+        self.failing = failing
+        self.polls = 0
+        self.started = 0
+        self.stopped = []
+        self.pending = dict()
+        self.max_running = 0
+
+    def start_query(self, **kwargs):
+        query_id = f"query-{self.started}"
+        self.started += 1
+        self.pending[query_id] = self.polls_before_complete
+        self.max_running = max(self.max_running, len(self.pending))
+        return {"queryId": query_id}
+
+    def get_query_results(self, queryId):
+        self.polls += 1
+        if queryId in self.failing:
+            self.pending.pop(queryId, None)
+            return {"queryId": queryId, "status": "Failed"}
+        if self.pending[queryId] > 0:
+            self.pending[queryId] -= 1
+            return {"queryId": queryId, "status": "Running"}
+        self.pending.pop(queryId)
+        return {"queryId": queryId, "status": "Complete", "results": []}
+
+    def stop_query(self, queryId):
+        self.stopped.append(queryId)
+        self.pending.pop(queryId, None)
+        return {"success": True}
+
+
+def test_execute_sharded_query(botree_session, monkeypatch):
+    """Shards hitting the row cap are split, rows are streamed in order."""
+    client = MockEventsLogs(events=range(100), row_cap=10)
+    monkeypatch.setattr(botree_session.logs.session, "client", lambda **kw: client)
+
+    rows = botree_session.logs.execute_sharded_query(
+        ["/log/group/mock"],
+        "sort @timestamp asc | limit 10",
+        0,
+        99,
+        shards=4,
+        max_concurrent=3,
+        max_rows=10,
+        poll_interval=0.001,
+    )
+
+    assert [int(row[0]["value"]) for row in rows] == list(range(100))
+    assert client.max_running <= 3
+
+
+class MockEventsLogs:
+    """Logs client mock answering queries from a list of event timestamps."""
+
+    def __init__(self, events, row_cap):
+        self.events = list(events)
+        self.row_cap = row_cap
+        self.queries = dict()
+        self.max_running = 0
+
+    def start_query(self, startTime, endTime, **kwargs):
+        query_id = f"query-{len(self.queries)}"
+        self.queries[query_id] = (startTime, endTime, "Running")
+        running = [q for q in self.queries.values() if q[2] == "Running"]
+        self.max_running = max(self.max_running, len(running))
+        return {"queryId": query_id}
+
+    def get_query_results(self, queryId):
+        start, end, _ = self.queries[queryId]
+        self.queries[queryId] = (start, end, "Complete")
+        selected = [e for e in self.events if start <= e <= end][: self.row_cap]
+        results = [[{"field": "@timestamp", "value": str(e)}] for e in selected]
+        return {"status": "Complete", "results": results}
+
+    def stop_query(self, queryId):
+        return {"success": True}
+
+
+def put_events(client, group, streams, count):
+    """Create a log group with `count` events in each stream."""
+    now = int(time.time() * 1000)
+    client.create_log_group(logGroupName=group)
+    for stream in streams:
+        client.create_log_stream(logGroupName=group, logStreamName=stream)
+        client.put_log_events(
+            logGroupName=group,
+            logStreamName=stream,
+            logEvents=[
+                {"timestamp": now + i, "message": f"{stream} {i}"} for i in range(count)
+            ],
+        )
+
+
+def test_filter_and_export_events(botree_session, tmp_path):
+    """Events of several groups are paginated, checkpointed and exported."""
+    with mock_logs():
+        logs = botree_session.logs
+        put_events(logs.client, "/group/a", ["s1"], 7)
+        put_events(logs.client, "/group/b", ["s1", "s2"], 3)
+
+        checkpoint = tmp_path / "export.json"
+        events = logs.filter_events(
+            ["/group/a", "/group/b"], checkpoint=checkpoint, limit=2
+        )
+        target = tmp_path / "events.ndjson.gz"
+        assert logs.export_events(events, target) == 13
+
+        lines = gzip.open(target, "rt").read().splitlines()
+        assert json.loads(lines[0])["logGroupName"] == "/group/a"
+
+        resumed = list(
+            logs.filter_events(["/group/a", "/group/b"], checkpoint=checkpoint)
+        )
+        assert resumed == []
+
+
+def test_export_resumes_after_crash(botree_session, tmp_path):
+    """Tokens only cover events on disk, and a torn write is dropped on resume."""
+    with mock_logs():
+        logs = botree_session.logs
+        put_events(logs.client, "/group/a", ["s1"], 7)
+        put_events(logs.client, "/group/b", ["s1", "s2"], 3)
+        groups = ["/group/a", "/group/b"]
+        target = tmp_path / "events.ndjson.gz"
+
+        def crashing(events):
+            for index, event in enumerate(events):
+                if index == 5:
+                    raise RuntimeError("killed")
+                yield event
+
+        checkpoint = ExportCheckpoint(tmp_path / "export.json")
+        events = logs.filter_events(
+            groups, checkpoint=checkpoint, limit=2, max_workers=2
+        )
+        with pytest.raises(RuntimeError):
+            logs.export_events(crashing(events), target, checkpoint=checkpoint)
+        with open(target, "ab") as file:
+            file.write(b"torn write")
+
+        checkpoint = ExportCheckpoint(tmp_path / "export.json")
+        events = logs.filter_events(
+            groups, checkpoint=checkpoint, limit=2, max_workers=2
+        )
+        logs.export_events(events, target, append=True, checkpoint=checkpoint)
+
+        lines = gzip.open(target, "rt").read().splitlines()
+        exported = [(e["logGroupName"], e["eventId"]) for e in map(json.loads, lines)]
+        assert len(exported) == len(set(exported)) == 13
+
+
+class MockStreamLogs:
+    """get_log_events returning an empty page in the middle of a stream."""
+
+    def __init__(self):
+        self.pages = [["a"], [], ["b"], []]
+
+    def get_log_events(self, nextToken=None, **kwargs):
+        index = int(nextToken or 0)
+        events = [{"message": message} for message in self.pages[index]]
+        next_index = min(index + 1, len(self.pages) - 1)
+        return {"events": events, "nextForwardToken": str(next_index)}
+
+
+def test_stream_events_empty_pages(botree_session, monkeypatch):
+    """An empty page does not end a stream, the repeated token does."""
+    client = MockStreamLogs()
+    monkeypatch.setattr(botree_session.logs.session, "client", lambda **kw: client)
+
+    events = list(botree_session.logs.stream_events("/group", ["stream"]))
+
+    assert [event["message"] for event in events] == ["a", "b"]
+
+
+def test_stream_events_parallel(botree_session):
+    """Log streams are read forward, in parallel."""
+    with mock_logs():
+        logs = botree_session.logs
+        put_events(logs.client, "/group/a", ["s1", "s2", "s3"], 4)
+
+        events = list(logs.stream_events("/group/a", ["s1", "s2", "s3"], max_workers=3))
+
+        assert len(events) == 12
+        first_stream = [e["message"] for e in events if e["logStreamName"] == "s1"]
+        assert first_stream == [f"s1 {i}" for i in range(4)]
+
+
+INSIGHTS_RESULTS = {
+    "status": "Complete",
+    "results": [
+        [
+            {"field": "@timestamp", "value": "2023-07-01 12:00:00.250"},
+            {"field": "count", "value": "3"},
+            {"field": "@ptr", "value": "abc"},
+        ],
+        [
+            {"field": "@timestamp", "value": "2023-07-01 12:01:00.000"},
+            {"field": "count", "value": "4.5"},
+            {"field": "host", "value": "a"},
+        ],
+    ],
+}
+
+
+def test_results_to_columns():
+    """Rows are pivoted to typed columns, missing cells are None."""
+    columns = results_to_columns(INSIGHTS_RESULTS)
+
+    assert list(columns) == ["@timestamp", "count", "host"]
+    assert columns["@timestamp"][0] == datetime(
+        2023, 7, 1, 12, 0, 0, 250000, tzinfo=timezone.utc
+    )
+    assert columns["count"] == [3.0, 4.5]
+    assert columns["host"] == [None, "a"]
+
+    raw = results_to_columns(INSIGHTS_RESULTS["results"], False, False)
+    assert raw["@ptr"] == ["abc", None]
+    assert raw["count"] == ["3", "4.5"]
+
+
+def test_results_to_dataframe():
+    """Results are converted to a typed pandas DataFrame."""
+    pandas = pytest.importorskip("pandas")
+
+    frame = results_to_dataframe(INSIGHTS_RESULTS)
+
+    assert list(frame.columns) == ["@timestamp", "count", "host"]
+    assert pandas.api.types.is_float_dtype(frame["count"])
+    assert pandas.api.types.is_datetime64_any_dtype(frame["@timestamp"])
+
+
+class MockPutLogs:
+    """Records put_log_events calls, throttling the first one."""
+
+    def __init__(self):
+        self.batches = []
+
+    def put_log_events(self, **kwargs):
+        if not self.batches:
+            self.batches.append(None)
+            raise ClientError(
+                {"Error": {"Code": "ThrottlingException"}}, "PutLogEvents"
+            )
+        self.batches.append(kwargs["logEvents"])
+
+
+def test_put_batches(monkeypatch):
+    """Batches are sorted and split on count, size and the 24h span."""
+    monkeypatch.setattr("botree.logs.PUT_MAX_EVENTS", 3)
+    day = 24 * 3600 * 1000
+    events = [{"timestamp": t, "message": "x"} for t in (5, 1, 2, 3, day + 10, 4)]
+
+    batches = [[e["timestamp"] for e in batch] for batch in _put_batches(events)]
+
+    assert batches == [[1, 2, 3], [4, 5], [day + 10]]
+
+
+def test_log_writer_retries_throttling(monkeypatch):
+    """Events are shipped in order after a throttled request."""
+    monkeypatch.setattr("botree.logs.time.sleep", lambda seconds: None)
+    client = MockPutLogs()
+
+    with LogWriter(client, "/group", "stream", flush_interval=60) as writer:
+        for i in range(5):
+            writer.put(str(i), timestamp=100 - i)
+        assert writer.flush(timeout=5)
+        assert writer.sent == 5
+
+    assert [e["message"] for e in client.batches[1]] == ["4", "3", "2", "1", "0"]
+    assert writer.failed == writer.dropped == 0
+
+
+def test_log_writer_counts_rejected_events():
+    """Events rejected by PutLogEvents are counted as failed, not sent."""
+
+    class RejectingPutLogs:
+        def put_log_events(self, **kwargs):
+            return {
+                "rejectedLogEventsInfo": {
+                    "tooOldLogEventEndIndex": 2,
+                    "expiredLogEventEndIndex": 1,
+                    "tooNewLogEventStartIndex": 9,
+                }
+            }
+
+    with LogWriter(RejectingPutLogs(), "/group", "stream") as writer:
+        for i in range(10):
+            writer.put(str(i), timestamp=i)
+        assert writer.flush(timeout=5)
+
+    assert writer.sent == 7 and writer.failed == 3
+    assert isinstance(writer.last_error, ValueError)
+
+
+def test_log_writer_invalid_events(monkeypatch):
+    """Empty messages are rejected alone and oversized ones are truncated."""
+    monkeypatch.setattr("botree.logs.time.sleep", lambda seconds: None)
+    client = MockPutLogs()
+
+    with LogWriter(client, "/group", "stream") as writer:
+        assert not writer.put("")
+        assert writer.put("é" * 200000, timestamp=1)
+        assert writer.put("ok", timestamp=2)
+        assert writer.flush(timeout=5)
+
+    assert writer.sent == 2 and writer.failed == 1
+    assert isinstance(writer.last_error, ValueError)
+    big, small = client.batches[1]
+    assert len(big["message"].encode("utf-8")) == 262118 and small["message"] == "ok"
+
+
+def test_log_handler(botree_session):
+    """Python logging records are shipped to a log stream."""
+    with mock_logs():
+        logs = botree_session.logs
+        logger = logging.getLogger("botree.tests.handler")
+        handler = LogHandler(logs.writer("/app", "main", flush_interval=0.05))
+        logger.addHandler(handler)
+
+        try:
+            for i in range(20):
+                logger.warning("event %d", i)
+            time.sleep(0.2)
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+        events = logs.client.get_log_events(logGroupName="/app", logStreamName="main")
+        assert [e["message"] for e in events["events"]][:2] == ["event 0", "event 1"]
+        assert len(events["events"]) == 20
@@ -0,0 +1,63 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from botocore.exceptions import ClientError
+from moto import mock_s3
+
+from botree.metrics import LATENCY_BUCKETS
+from botree.metrics import Metrics
+
+
+def test_session_instrument(botree_session, botree_test_bucket, text_file):
+    """S3 calls of an instrumented session are counted, timed and sized."""
+    with mock_s3():
+        records = []
+        botree_session.s3.create_bucket(botree_test_bucket)
+        metrics = botree_session.instrument(records.append)
+        assert botree_session.instrument() is metrics
+
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        bucket.upload(text_file, Path("file.txt"))
+        bucket.client.get_object(Bucket=botree_test_bucket, Key="file.txt")
+        with pytest.raises(ClientError):
+            bucket.client.get_object(Bucket=botree_test_bucket, Key="missing")
+
+        s3 = metrics.snapshot()["s3"]
+        size = text_file.stat().st_size
+        assert s3["PutObject"]["calls"] == 1
+        assert s3["PutObject"]["bytes_sent"] == size
+        assert s3["GetObject"]["calls"] == 2
+        assert s3["GetObject"]["errors"] == 1
+        assert s3["GetObject"]["bytes_received"] >= size
+        assert sum(s3["GetObject"]["buckets"]) == 2
+        assert len(s3["GetObject"]["buckets"]) == len(LATENCY_BUCKETS) + 1
+        assert [r.error for r in records if r.operation == "GetObject"] == [
+            None,
+            "NoSuchKey",
+        ]
+
+
+def test_metrics_retries_and_throttles():
+    """Attempts and throttled responses of a call are recorded."""
+    metrics = Metrics()
+    context = {}
+    model = SimpleNamespace(name="GetSecretValue")
+    model.service_model = SimpleNamespace(service_name="secretsmanager")
+    throttled = (
+        SimpleNamespace(status_code=400),
+        {"Error": {"Code": "ThrottlingException"}},
+    )
+    ok = SimpleNamespace(status_code=200, headers={"content-length": "10"})
+
+    metrics._before_call(model=model, context=context)
+    metrics._needs_retry(request_dict={"context": context}, response=throttled)
+    metrics._needs_retry(request_dict={"context": context}, response=(ok, {}))
+    metrics._after_call(http_response=ok, parsed={}, context=context)
+
+    stats = metrics.snapshot()["secretsmanager"]["GetSecretValue"]
+    assert stats["retries"] == 1
+    assert stats["throttles"] == 1
+    assert stats["bytes_received"] == 10
+    assert stats["errors"] == 0
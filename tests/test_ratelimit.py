@@ -0,0 +1,50 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+from moto import mock_s3
+
+from botree.ratelimit import TokenBucket
+
+
+def test_token_bucket_aimd(monkeypatch):
+    """Throttles halve the rate once per cooldown, successes raise it back."""
+    sleeps = []
+    monkeypatch.setattr("botree.ratelimit.time.sleep", sleeps.append)
+    bucket = TokenBucket(100, increase=10, cooldown=60)
+
+    bucket.throttled()
+    bucket.throttled()
+    assert bucket.rate == 50
+    assert bucket.throttles == 2
+
+    assert bucket.acquire() > 0
+    assert sleeps
+
+    for _ in range(50):
+        bucket.success()
+    assert 50 < bucket.rate <= 60
+
+
+def test_session_rate_limits(botree_session, botree_test_bucket, text_file):
+    """Clients of a session share service and S3 prefix buckets."""
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        service = botree_session.rate_limit("s3", 1000)
+        limits = botree_session.rate_limit_s3_prefixes(read_rate=10, write_rate=5)
+
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        bucket.upload(text_file, Path("folder/file.txt"))
+        bucket.client.get_object(Bucket=botree_test_bucket, Key="folder/file.txt")
+
+        assert limits.services == {"s3": service}
+        assert limits.prefixes[(botree_test_bucket, "folder", False)].max_rate == 5
+        assert limits.prefixes[(botree_test_bucket, "folder", True)].max_rate == 10
+        assert service.throttles == 0
+
+        throttled = (
+            SimpleNamespace(status_code=503),
+            {"Error": {"Code": "SlowDown"}},
+        )
+        context = {"botree_rate_limits": [service]}
+        limits._needs_retry(request_dict={"context": context}, response=throttled)
+        assert service.rate == 500
@@ -1,3 +1,4 @@
+from importlib import import_module
 from pathlib import Path
 
 import pytest
@@ -34,8 +35,8 @@ def test_listobj_upload_download_delete(botree_session, botree_test_bucket, text
 
         botree_session.s3.bucket(botree_test_bucket).delete(text_file.name)
 
-        with pytest.raises(KeyError):
-            files = botree_session.s3.bucket(botree_test_bucket).list_files()
+        files = botree_session.s3.bucket(botree_test_bucket).list_files()
+        assert files == []
 
 
 def test_copy_object(botree_session, botree_test_bucket, text_file):
@@ -61,3 +62,391 @@ def test_copy_object(botree_session, botree_test_bucket, text_file):
 
         files = botree_session.s3.bucket(botree_test_bucket).list_files()
         assert files == [uploaded_file_path.name]
+
+
+def test_upload_dir_download_prefix(botree_session, botree_test_bucket, tmp_path):
+    """Bulk upload of a directory tree and download of a prefix."""
+    source = tmp_path / "source"
+    (source / "nested").mkdir(parents=True)
+    (source / "a.txt").write_text("botree", encoding="utf-8")
+    (source / "nested" / "b.txt").write_text("botree test!", encoding="utf-8")
+
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+
+        uploaded = bucket.upload_dir(source, "data", max_workers=2)
+
+        assert uploaded.transferred == {"data/a.txt": 6, "data/nested/b.txt": 12}
+        assert not uploaded.failed
+        assert uploaded.bytes == 18
+
+        target = tmp_path / "target"
+        downloaded = bucket.download_prefix("data", target, max_workers=2)
+
+        assert downloaded.bytes == 18
+        assert (target / "nested" / "b.txt").read_text() == "botree test!"
+
+
+def test_download_prefix_reports_failures(
+    botree_session, botree_test_bucket, tmp_path, monkeypatch
+):
+    """Failed transfers are reported per key instead of raised."""
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        bucket.client.put_object(Bucket=botree_test_bucket, Key="x/1", Body=b"1")
+
+        def broken_download(*args, **kwargs):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(bucket, "download", broken_download)
+        report = bucket.download_prefix("x", tmp_path)
+
+        assert list(report.failed) == ["x/1"]
+        assert report.transferred == {}
+
+
+def test_download_prefix_stays_under_target(
+    botree_session, botree_test_bucket, tmp_path
+):
+    """Prefixes match whole directories and keys cannot escape the target."""
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        for key in ("data/a.txt", "data2/b.txt", "data/../../x"):
+            bucket.client.put_object(Bucket=botree_test_bucket, Key=key, Body=b"1")
+
+        target = tmp_path / "target"
+        report = bucket.download_prefix("data", target)
+
+        assert list(report.transferred) == ["data/a.txt"]
+        assert list(report.failed) == ["data/../../x"]
+        assert isinstance(report.failed["data/../../x"], ValueError)
+        assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == ["a.txt"]
+
+
+def test_sync_skips_unchanged(botree_session, botree_test_bucket, tmp_path):
+    """Only new or modified files are transferred by sync."""
+    local = tmp_path / "local"
+    local.mkdir()
+    (local / "a.txt").write_text("first", encoding="utf-8")
+    (local / "b.txt").write_text("second", encoding="utf-8")
+
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+
+        first = bucket.sync(local, "data")
+        assert sorted(first.transferred) == ["data/a.txt", "data/b.txt"]
+        assert (local / ".botree-sync.json").is_file()
+
+        (local / "b.txt").write_text("changed", encoding="utf-8")
+        second = bucket.sync(local, "data")
+        assert list(second.transferred) == ["data/b.txt"]
+        assert second.skipped == 1
+
+        mirror = tmp_path / "mirror"
+        assert len(bucket.sync(mirror, "data", direction="download").transferred) == 2
+        again = bucket.sync(mirror, "data", direction="download")
+        assert again.transferred == {} and again.skipped == 2
+        assert (mirror / "b.txt").read_text() == "changed"
+
+
+def test_sync_download_stays_under_prefix(botree_session, botree_test_bucket, tmp_path):
+    """Downloads ignore sibling prefixes and keys escaping the directory."""
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        for key in ("data/a.txt", "data2/b.txt", "data/../../x"):
+            bucket.client.put_object(Bucket=botree_test_bucket, Key=key, Body=b"1")
+
+        mirror = tmp_path / "mirror"
+        report = bucket.sync(mirror, "data", direction="download")
+
+        assert list(report.transferred) == ["data/a.txt"]
+        assert list(report.failed) == ["data/../../x"]
+        assert sorted(p.name for p in tmp_path.rglob("*.txt")) == ["a.txt"]
+        assert not (tmp_path / "x").exists()
+
+
+def test_multipart_etag(tmp_path):
+    """Local ETags match S3 single part and multipart ETags."""
+    from botree.s3 import MIB
+    from botree.s3 import SyncManifest
+    from botree.s3 import file_etag
+
+    path = tmp_path / "big.bin"
+    path.write_bytes(b"x" * (10 * MIB))
+
+    etag = file_etag(path, 8 * MIB)
+    assert etag.endswith("-2")
+
+    manifest = SyncManifest(tmp_path / "manifest.json")
+    assert manifest.matches("big.bin", path, f'"{etag}"')
+    assert manifest.matches("big.bin", path, file_etag(path))
+    assert not manifest.matches("big.bin", path, "0" * 32)
+
+
+def test_list_files_paginated_top_n(botree_session, botree_test_bucket):
+    """Listing follows pagination and keeps only the top-N files by date."""
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        keys = [f"logs/{i:02d}.txt" for i in range(12)]
+        for key in keys:
+            bucket.client.put_object(Bucket=botree_test_bucket, Key=key, Body=b"x")
+
+        paged = {"PaginationConfig": {"PageSize": 5}}
+        assert bucket.list_files("logs/", **paged) == keys
+        newest = bucket.list_files("logs/", reverse=True)
+        assert bucket.list_files("logs/", reverse=True, limit=3) == newest[:3]
+        assert bucket.list_files("logs/", limit=2) == keys[:2]
+        assert list(bucket.iter_files("logs/", **paged)) == keys
+        assert bucket.list_files("missing/") == []
+
+
+def test_list_folders_paginated(botree_session, botree_test_bucket):
+    """Folder listing follows pagination and handles empty prefixes."""
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        for i in range(4):
+            bucket.client.put_object(
+                Bucket=botree_test_bucket, Key=f"root/{i}/file.txt", Body=b"x"
+            )
+
+        folders = bucket.list_folders("root", PaginationConfig={"PageSize": 3})
+        assert folders == [f"root/{i}/" for i in range(4)]
+        assert bucket.list_folders() == ["root/"]
+        assert bucket.list_folders("missing") == []
+
+
+def test_delete_prefix_and_many(botree_session, botree_test_bucket):
+    """Batched deletes, with dry run and per-key reporting."""
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        for i in range(5):
+            bucket.client.put_object(
+                Bucket=botree_test_bucket, Key=f"tmp/{i}", Body=b"ab"
+            )
+        for key in ("keep", "tmp-archive/x"):
+            bucket.client.put_object(Bucket=botree_test_bucket, Key=key, Body=b"x")
+
+        dry = bucket.delete_prefix("tmp/", dry_run=True)
+        assert len(dry.transferred) == 5 and dry.bytes == 10
+        assert len(bucket.list_files("tmp/")) == 5
+
+        deleted = bucket.delete_prefix("tmp", max_workers=2)
+        assert sorted(deleted.transferred) == [f"tmp/{i}" for i in range(5)]
+        assert not deleted.failed
+        assert bucket.list_files() == ["keep", "tmp-archive/x"]
+
+        report = bucket.delete_many(iter([Path("keep"), "tmp-archive/x"]))
+        assert sorted(report.transferred) == ["keep", "tmp-archive/x"]
+        assert bucket.list_files() == []
+
+
+def test_copy_prefix(botree_session, botree_test_bucket, tmp_path, monkeypatch):
+    """Concurrent prefix copy between buckets, multipart and resumable."""
+    monkeypatch.setattr("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 256)
+
+    with mock_s3():
+        source_name = "other-botree-test-bucket"
+        botree_session.s3.create_bucket(botree_test_bucket)
+        botree_session.s3.create_bucket(source_name)
+        source = botree_session.s3.bucket(source_name)
+        target = botree_session.s3.bucket(botree_test_bucket)
+
+        big = bytes(range(256)) * 4
+        source.client.put_object(
+            Bucket=source_name,
+            Key="src/big.bin",
+            Body=big,
+            CacheControl="max-age=60",
+            ContentEncoding="identity",
+            Metadata={"origin": "test"},
+            Tagging="team=data&tier=gold",
+        )
+        for i in range(3):
+            source.client.put_object(Bucket=source_name, Key=f"src/{i}", Body=b"x")
+
+        checkpoint = tmp_path / "copy.checkpoint"
+        checkpoint.write_text("src/0\n", encoding="utf-8")
+
+        report = target.copy_prefix(
+            "src/",
+            "dst/",
+            source_bucket=source_name,
+            multipart_threshold=512,
+            part_size=300,
+            checkpoint=checkpoint,
+        )
+
+        assert sorted(report.transferred) == ["dst/1", "dst/2", "dst/big.bin"]
+        assert report.skipped == 1
+        assert sorted(target.list_files("dst/")) == ["dst/1", "dst/2", "dst/big.bin"]
+        body = target.client.get_object(Bucket=botree_test_bucket, Key="dst/big.bin")
+        assert body["Body"].read() == big
+        assert body["CacheControl"] == "max-age=60"
+        assert body["ContentEncoding"] == "identity"
+        assert body["Metadata"] == {"origin": "test"}
+        tags = target.client.get_object_tagging(
+            Bucket=botree_test_bucket, Key="dst/big.bin"
+        )["TagSet"]
+        assert {tag["Key"]: tag["Value"] for tag in tags} == {
+            "team": "data",
+            "tier": "gold",
+        }
+        assert len(checkpoint.read_text().splitlines()) == 4
+
+        # Parts grow to stay within the part count limit
+        monkeypatch.setattr(import_module("botree.s3"), "MAX_PARTS", 2)
+        report = target.copy_prefix(
+            "src",
+            "few",
+            source_bucket=source_name,
+            multipart_threshold=512,
+            part_size=300,
+        )
+        assert len(report.transferred) == 4
+        head = target.client.head_object(Bucket=botree_test_bucket, Key="few/big.bin")
+        assert head["ETag"].strip('"').endswith("-2")
+
+
+def test_open_stream(botree_session, botree_test_bucket, monkeypatch):
+    """Streaming writes (multipart) and ranged, seekable reads."""
+    monkeypatch.setattr("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 256)
+
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        chunks = [bytes([i]) * 100 for i in range(10)]
+
+        with bucket.open("stream.bin", "wb", part_size=300) as stream:
+            for chunk in chunks:
+                stream.write(chunk)
+
+        assert (
+            len(
+                bucket.client.list_multipart_uploads(Bucket=botree_test_bucket).get(
+                    "Uploads", []
+                )
+            )
+            == 0
+        )
+
+        with bucket.open("stream.bin", part_size=256) as stream:
+            assert stream.read(150) == b"".join(chunks)[:150]
+            stream.seek(-100, 2)
+            assert stream.read() == chunks[-1]
+
+        with bucket.open("notes.txt", "w", encoding="utf-8") as text:
+            text.write("botree test!")
+
+        with bucket.open("notes.txt", "r", encoding="utf-8") as text:
+            assert text.read() == "botree test!"
+
+
+def test_open_write_aborts_on_error(botree_session, botree_test_bucket, monkeypatch):
+    """A failing writer aborts the multipart upload and creates nothing."""
+    monkeypatch.setattr("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 256)
+
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+
+        for mode, data in (("wb", b"x" * 600), ("w", "partial")):
+            try:
+                with bucket.open("broken", mode, part_size=256) as stream:
+                    stream.write(data)
+                    raise RuntimeError("pipeline failed")
+            except RuntimeError:
+                pass
+
+        assert bucket.list_files() == []
+        assert not bucket.client.list_multipart_uploads(Bucket=botree_test_bucket).get(
+            "Uploads"
+        )
+
+
+def test_download_parallel(botree_session, botree_test_bucket, tmp_path, monkeypatch):
+    """Concurrent ranged download into a file or a buffer, with ETag check."""
+    monkeypatch.setattr("moto.s3.models.S3_UPLOAD_PART_MIN_SIZE", 256)
+
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        data = bytes(range(256)) * 5
+        bucket.client.put_object(Bucket=botree_test_bucket, Key="single", Body=data)
+        with bucket.open("multi", "wb", part_size=300) as stream:
+            stream.write(data)
+
+        target = tmp_path / "single.bin"
+        assert bucket.download_parallel("single", target, part_size=100) == len(data)
+        assert target.read_bytes() == data
+
+        buffer = bytearray(len(data))
+        bucket.download_parallel("multi", buffer, max_workers=3)
+        assert buffer == data
+
+        with pytest.raises(ValueError):
+            bucket.download_parallel("multi", bytearray(10))
+
+
+def test_object_cache(botree_session, botree_test_bucket, tmp_path):
+    """Downloads are served from the cache until the object changes."""
+    from botree.s3 import ObjectCache
+
+    cache = ObjectCache(tmp_path / "cache", max_bytes=10)
+
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket, cache=cache)
+        bucket.client.put_object(Bucket=botree_test_bucket, Key="ref", Body=b"v1")
+
+        for i in range(3):
+            bucket.download("ref", tmp_path / f"ref{i}")
+        assert (tmp_path / "ref2").read_bytes() == b"v1"
+        assert cache.stats == {"hits": 2, "misses": 1, "bytes_saved": 4}
+
+        bucket.client.put_object(Bucket=botree_test_bucket, Key="ref", Body=b"v2")
+        bucket.download("ref", tmp_path / "ref3")
+        assert (tmp_path / "ref3").read_bytes() == b"v2"
+        assert cache.misses == 2
+
+        bucket.client.put_object(Bucket=botree_test_bucket, Key="big", Body=b"x" * 9)
+        bucket.download("big", tmp_path / "big")
+        cached = [p for p in (tmp_path / "cache").iterdir() if not p.suffix]
+        assert len(cached) == 1
+
+
+def test_copy_prefix_into_itself(botree_session, botree_test_bucket, monkeypatch):
+    """A target nested in the source is not copied again, across listing pages."""
+    from botree.s3 import Bucket
+
+    iter_objects = Bucket.iter_objects
+    monkeypatch.setattr(
+        Bucket,
+        "iter_objects",
+        lambda self, prefix="", page_size=1000: iter_objects(self, prefix, 10),
+    )
+
+    with mock_s3():
+        botree_session.s3.create_bucket(botree_test_bucket)
+        bucket = botree_session.s3.bucket(botree_test_bucket)
+        keys = [f"data/{i:02d}" for i in range(25)] + ["data2/x"]
+        for key in keys:
+            bucket.client.put_object(Bucket=botree_test_bucket, Key=key, Body=b"x")
+
+        report = bucket.copy_prefix("data", "data/archive", max_workers=4)
+
+        assert len(report.transferred) == 25 and not report.failed
+        assert sorted(bucket.list_files("data/archive/")) == [
+            f"data/archive/{i:02d}" for i in range(25)
+        ]
+        assert len(bucket.list_files()) == 51
+
+        with pytest.raises(ValueError):
+            bucket.copy_prefix("data/archive", "data")
@@ -1,3 +1,8 @@
+import json
+
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
 from moto import mock_secretsmanager
 
 
@@ -63,3 +68,229 @@ def test_get_a_secret(botree_session):
         existing_secrets = botree_session.secrets_manager.list_secrets()
 
         assert existing_secrets["SecretList"][0]["Name"] == new_secret_name
+
+
+def test_secret_cache(botree_session, monkeypatch):
+    """Cached secrets are fetched once per TTL and invalidated on delete."""
+    with mock_secretsmanager():
+        secrets_manager = botree_session.secrets_manager
+        secrets_manager.create_secret(
+            name="botree-dev",
+            secret={"user": "username", "pass": "areallystrongpassword"},
+            description="it`s only a test",
+        )
+        cache = secrets_manager.enable_cache(ttl=60, refresh_ahead=0)
+
+        calls = []
+        fetch = cache.fetch
+        monkeypatch.setattr(
+            cache, "fetch", lambda **kw: calls.append(kw) or fetch(**kw)
+        )
+
+        with ThreadPoolExecutor(8) as pool:
+            secrets = list(pool.map(secrets_manager.get_secret, ["botree-dev"] * 16))
+
+        assert len(calls) == 1
+        assert secrets[0]["Name"] == "botree-dev"
+        assert json.loads(secrets[-1]["SecretString"])["user"] == "username"
+
+        secrets_manager.get_secret("botree-dev", VersionStage="AWSCURRENT")
+        assert len(calls) == 2
+
+        cache.ttls["botree-dev"] = 0
+        secrets_manager.delete_secret("botree-dev", force_delete=True)
+        assert len(cache) == 0
+
+
+def test_secret_cache_lru_and_refresh_ahead():
+    """The cache is bounded and refreshes entries about to expire."""
+    import time
+
+    from botree.secrets_manager import SecretCache
+
+    calls = []
+
+    def fetch(**kwargs):
+        calls.append(kwargs["SecretId"])
+        return {"Name": kwargs["SecretId"], "Version": len(calls)}
+
+    cache = SecretCache(fetch, ttl=0.5, max_size=2, refresh_ahead=0.5)
+    versions = [cache.get(name)["Version"] for name in ["a", "b", "c"]]
+    assert versions == [1, 2, 3]
+    assert len(cache) == 2
+
+    time.sleep(0.3)
+    cache.get("c")
+    time.sleep(0.1)
+    assert calls.count("c") == 2
+
+
+def test_get_secrets_fallback(botree_session):
+    """Many secrets at once, through concurrent get_secret_value calls."""
+    with mock_secretsmanager():
+        names = [f"botree-dev-{i}" for i in range(5)]
+        for name in names:
+            botree_session.secrets_manager.create_secret(
+                name=name, secret={"user": name}, description="it`s only a test"
+            )
+
+        secrets, errors = botree_session.secrets_manager.get_secrets(
+            names + ["missing"]
+        )
+
+        assert sorted(secrets) == names
+        assert json.loads(secrets["botree-dev-3"]["SecretString"]) == {
+            "user": "botree-dev-3"
+        }
+        assert list(errors) == ["missing"]
+
+
+def test_get_secrets_batch(botree_session, monkeypatch):
+    """Many secrets at once, through BatchGetSecretValue in chunks of 20."""
+    monkeypatch.setattr(
+        botree_session.secrets_manager.session, "client", mocked_secretsmanager
+    )
+    names = [f"secret-{i}" for i in range(45)] + ["missing"]
+
+    secrets, errors = botree_session.secrets_manager.get_secrets(names)
+
+    assert len(secrets) == 45
+    assert secrets["secret-44"]["SecretString"] == "value-secret-44"
+    assert errors["missing"].response["Error"]["Code"] == "ResourceNotFoundException"
+    assert sorted(MockSecretsManager.batch_sizes) == [6, 20, 20]
+
+
+def test_get_secrets_batch_errors(botree_session, monkeypatch):
+    """Failed batches are reported per name, or fetched one by one if denied."""
+    from botocore.exceptions import ClientError
+
+    def failing_batch(SecretIdList):
+        code = "AccessDenied" if "denied" in SecretIdList[0] else "ThrottlingException"
+        raise ClientError({"Error": {"Code": code}}, "BatchGetSecretValue")
+
+    def get_secret(name):
+        return {"Name": name, "SecretString": f"single-{name}"}
+
+    manager = botree_session.secrets_manager
+    monkeypatch.setattr(manager.session, "client", mocked_secretsmanager)
+    monkeypatch.setattr(manager.client, "batch_get_secret_value", failing_batch)
+    monkeypatch.setattr(manager, "get_secret", get_secret)
+
+    names = [f"denied-{i}" for i in range(20)] + ["throttled"]
+    secrets, errors = manager.get_secrets(names)
+
+    assert sorted(secrets) == sorted(names[:20])
+    assert secrets["denied-3"]["SecretString"] == "single-denied-3"
+    assert list(errors) == ["throttled"]
+    assert errors["throttled"].response["Error"]["Code"] == "ThrottlingException"
+
+
+def mocked_secretsmanager(*args, **kwargs):
+    return MockSecretsManager()
+
+
+class MockSecretsManager:
+    """Class with mocked data to be able to test batch secret retrieval."""
+
+    batch_sizes: list = []
+
+    def batch_get_secret_value(self, SecretIdList):
+        MockSecretsManager.batch_sizes.append(len(SecretIdList))
+        found = [name for name in SecretIdList if name != "missing"]
+        return {
+            "SecretValues": [
+                {"ARN": f"arn:{name}", "Name": name, "SecretString": f"value-{name}"}
+                for name in found
+            ],
+            "Errors": (
+                [
+                    {
+                        "SecretId": "missing",
+                        "ErrorCode": "ResourceNotFoundException",
+                        "Message": "Secrets Manager can't find the specified secret.",
+                    }
+                ]
+                if "missing" in SecretIdList
+                else []
+            ),
+        }
+
+
+def test_iter_and_describe_secrets(botree_session):
+    """All pages are listed, filtered server side, and described concurrently."""
+    with mock_secretsmanager():
+        names = [f"botree-dev-{i:02d}" for i in range(12)] + ["other"]
+        for name in names:
+            botree_session.secrets_manager.create_secret(
+                name=name, secret={"user": name}, description="it`s only a test"
+            )
+
+        listed = botree_session.secrets_manager.iter_secrets(
+            names_only=True, page_size=5
+        )
+        assert sorted(listed) == sorted(names)
+
+        filters = [{"Key": "name", "Values": ["botree-dev"]}]
+        filtered = list(botree_session.secrets_manager.iter_secrets(filters=filters))
+        assert len(filtered) == 12 and "ARN" in filtered[0]
+
+        described = botree_session.secrets_manager.describe_secrets(
+            filters=filters, max_workers=4
+        )
+        assert sorted(d["Name"] for d in described) == names[:-1]
+
+
+def test_secret_value(botree_session, monkeypatch):
+    """Secret payloads are parsed once per version and read like mappings."""
+    import botree.secrets_manager
+
+    with mock_secretsmanager():
+        botree_session.secrets_manager.create_secret(
+            name="botree-dev",
+            secret={"user": "username", "pass": "areallystrongpassword"},
+            description="it`s only a test",
+        )
+
+        loads = []
+        monkeypatch.setattr(
+            botree.secrets_manager,
+            "json",
+            SimpleNamespace(
+                loads=lambda string: loads.append(string) or json.loads(string)
+            ),
+        )
+
+        first = botree_session.secrets_manager.get_secret_value("botree-dev")
+        second = botree_session.secrets_manager.get_secret_value("botree-dev")
+
+        assert first["pass"] == "areallystrongpassword"
+        assert dict(second) == {"user": "username", "pass": "areallystrongpassword"}
+        assert len(loads) == 1
+        assert "areallystrongpassword" not in repr(first)
+
+        botree_session.secrets_manager.client.create_secret(
+            Name="botree-binary", SecretBinary=b"\x00\x01"
+        )
+        binary = botree_session.secrets_manager.get_secret_value("botree-binary")
+        assert bytes(binary.binary) == b"\x00\x01"
+
+
+def test_secret_cache_short_ttl_refresh():
+    """A TTL below refresh_ahead refreshes at most once per half TTL."""
+    import time
+
+    from botree.secrets_manager import SecretCache
+
+    calls = []
+
+    def fetch(**kwargs):
+        calls.append(kwargs["SecretId"])
+        return {"Name": kwargs["SecretId"]}
+
+    cache = SecretCache(fetch, ttl=300, refresh_ahead=30, ttls={"short": 0.4})
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        cache.get("short")
+        time.sleep(0.002)
+
+    assert 2 <= len(calls) <= 4